@@ -0,0 +1,199 @@
+"""
+Covariance estimates shared by the optimizer, frontier, risk decomposition
+and correlation views.
+
+Estimators (all annualised, daily returns × 252):
+
+  sample        unbiased sample covariance
+  ledoit_wolf   sample covariance shrunk towards a scaled identity with the
+                Ledoit–Wolf (2004) optimal intensity
+  ewma          RiskMetrics exponentially weighted covariance (λ = 0.94)
+
+Sample and Ledoit–Wolf are derived from running moments (Σr, Σrrᵀ, Σ‖r‖²r,
+Σ‖r‖⁴); EWMA from its recursion. When the returns matrix gains a bar (and
+a rolling window drops one), the state is updated with one rank-one term
+per row instead of recomputing from all T rows; a kept row whose values
+were revised is swapped out (old values removed, new ones added) and the
+EWMA is re-seeded.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Hashable
+
+import numpy as np
+
+from .risk import TRADING_DAYS, ReturnsMatrix
+
+ESTIMATORS = ("sample", "ledoit_wolf", "ewma")
+
+# Rebuild running moments from scratch after this many incremental updates
+# so add/remove round-off cannot accumulate.
+_REBUILD_AFTER = 500
+
+
+@dataclass
+class _Moments:
+    """Running moments of the rows currently in the window."""
+
+    n: int
+    s1: np.ndarray           # Σ r
+    s2: np.ndarray           # Σ r rᵀ
+    v3: np.ndarray           # Σ ‖r‖² r
+    a4: float                # Σ ‖r‖⁴
+
+    @classmethod
+    def empty(cls, k: int) -> _Moments:
+        return cls(0, np.zeros(k), np.zeros((k, k)), np.zeros(k), 0.0)
+
+    def update(self, rows: np.ndarray, sign: float) -> None:
+        """Add (sign=+1) or remove (sign=−1) rows: one rank-one term each."""
+        if not len(rows):
+            return
+        sq = np.einsum("ij,ij->i", rows, rows)
+        self.n += int(sign) * len(rows)
+        self.s1 += sign * rows.sum(axis=0)
+        self.s2 += sign * (rows.T @ rows)
+        self.v3 += sign * (sq @ rows)
+        self.a4 += sign * float(sq @ sq)
+
+    def sample(self) -> np.ndarray:
+        m = self.s1 / self.n
+        return (self.s2 - self.n * np.outer(m, m)) / (self.n - 1)
+
+    def ledoit_wolf(self) -> np.ndarray:
+        n, k = self.n, len(self.s1)
+        m = self.s1 / n
+        scatter = self.s2 - n * np.outer(m, m)        # Σ x xᵀ with x = r − m
+        s = scatter / n                               # biased sample covariance
+        mu = np.trace(s) / k
+        d2 = float(np.sum((s - mu * np.eye(k)) ** 2))
+        # Σ‖x‖⁴ from raw moments: ‖x‖² = ‖r‖² − 2mᵀr + ‖m‖²
+        mm = float(m @ m)
+        sum_x4 = (
+            self.a4
+            + 4.0 * float(m @ self.s2 @ m)
+            + n * mm * mm
+            - 4.0 * float(m @ self.v3)
+            + 2.0 * mm * float(np.trace(self.s2))
+            - 4.0 * mm * float(m @ self.s1)
+        )
+        b2 = min(max(sum_x4 / n**2 - float(np.sum(s * s)) / n, 0.0), d2)
+        delta = b2 / d2 if d2 > 0 else 0.0
+        return delta * mu * np.eye(k) + (1.0 - delta) * s
+
+
+@dataclass
+class _Window:
+    """Rows covered by an estimate, so the next matrix can be diffed against it."""
+
+    dates: np.ndarray
+    returns: np.ndarray
+    moments: _Moments | None = None
+    ewma: np.ndarray | None = None
+    updates: int = 0
+    estimates: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+class CovarianceEngine:
+    def __init__(self, ewma_lambda: float = 0.94) -> None:
+        self.ewma_lambda = ewma_lambda
+        self._lock = threading.Lock()
+        self._windows: dict[Hashable, _Window] = {}
+        self._stats: Counter[str] = Counter()
+
+    def estimate(self, key: Hashable, m: ReturnsMatrix, estimator: str) -> np.ndarray:
+        """
+        Annualised covariance of `m` (rows where every ticker has data) with
+        `estimator`. `key` names the window, e.g. (universe, range); state per
+        key is carried forward incrementally as `m` rolls.
+        """
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"unknown estimator {estimator!r}")
+        start = int(m.first_row.max())
+        dates, rets = m.dates[start:], m.returns[start:]
+        if len(rets) < 2:
+            raise ValueError("not enough history for a covariance estimate")
+
+        with self._lock:
+            win = self._sync(key, dates, rets)
+            cov = win.estimates.get(estimator)
+            if cov is not None:
+                self._stats["hits"] += 1
+                return cov
+            if estimator == "ewma":
+                if win.ewma is None:
+                    win.ewma = self._ewma_seed(rets)
+                daily = win.ewma
+            else:
+                if win.moments is None:
+                    win.moments = _Moments.empty(rets.shape[1])
+                    win.moments.update(rets, +1.0)
+                daily = win.moments.sample() if estimator == "sample" else win.moments.ledoit_wolf()
+            cov = win.estimates[estimator] = daily * TRADING_DAYS
+            return cov
+
+    def _sync(self, key: Hashable, dates: np.ndarray, rets: np.ndarray) -> _Window:
+        win = self._windows.get(key)
+        if win is not None and rets is win.returns:
+            return win
+
+        # Rolled forward: drop rows that left the window, add the new bars.
+        # The panel re-fetches (and may revise) its last few bars on every
+        # refresh, so rows kept from the old window are diffed too: a revised
+        # row is removed with its old values and added back with the new ones.
+        if win is not None and win.updates < _REBUILD_AFTER and dates[0] >= win.dates[0] \
+                and win.dates[-1] in dates:
+            n_drop = int(np.searchsorted(win.dates, dates[0]))
+            n_keep = int(np.searchsorted(dates, win.dates[-1], side="right"))
+            n_add = len(dates) - n_keep
+            old, kept = win.returns[n_drop:], rets[:n_keep]
+            if np.array_equal(win.dates[n_drop:], dates[:n_keep]):
+                revised = (old != kept).any(axis=1)
+                if not n_drop and not n_add and not revised.any():
+                    win.returns = rets
+                    return win
+                if win.moments is not None:
+                    win.moments.update(win.returns[:n_drop], -1.0)
+                    win.moments.update(old[revised], -1.0)
+                    win.moments.update(kept[revised], +1.0)
+                    win.moments.update(rets[n_keep:], +1.0)
+                if win.ewma is not None:
+                    if revised.any():
+                        win.ewma = None     # re-seeded over the new window on next use
+                    else:
+                        lam = self.ewma_lambda
+                        for r in rets[n_keep:]:
+                            win.ewma = lam * win.ewma + (1.0 - lam) * np.outer(r, r)
+                win.dates, win.returns = dates, rets
+                win.updates += 1
+                win.estimates.clear()
+                self._stats["incremental"] += 1
+                return win
+
+        self._stats["full"] += 1
+        win = self._windows[key] = _Window(dates, rets)
+        return win
+
+    def _ewma_seed(self, rets: np.ndarray) -> np.ndarray:
+        """EWMA over all rows (zero-mean), seeded with the first 20-row sample."""
+        lam = self.ewma_lambda
+        seed = min(20, len(rets))
+        cov = rets[:seed].T @ rets[:seed] / seed
+        tail = rets[seed:]
+        if len(tail):
+            # Closed form of the recursion: weights (1−λ)·λ^(age), seed decays as λ^len.
+            wts = (1.0 - lam) * lam ** np.arange(len(tail) - 1, -1, -1)
+            cov = lam ** len(tail) * cov + (tail * wts[:, None]).T @ tail
+        return cov
+
+    def stats(self) -> dict:
+        return {
+            "full_builds": self._stats["full"],
+            "incremental_updates": self._stats["incremental"],
+            "hits": self._stats["hits"],
+            "windows": len(self._windows),
+        }
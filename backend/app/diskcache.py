@@ -0,0 +1,131 @@
+"""
+Size-bounded, persistent key/value cache on SQLite with LRU eviction.
+
+One database file is shared by every worker process (WAL mode), so an entry
+fetched by one worker is visible to the others and survives restarts.
+Access times are only rewritten once per `touch_interval` to keep reads from
+turning into write contention. Storage errors are logged and treated as
+misses: the cache must never take a request down.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+logger = logging.getLogger("btc-lab")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    stored_at   REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at);
+"""
+
+
+class DiskLRU:
+    def __init__(self, path: Path, max_bytes: int, touch_interval: float = 60.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._stats: Counter[str] = Counter()
+        self._created = False     # directory and schema, on first connection
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not self._created:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._created:
+                conn.executescript(_SCHEMA)
+                self._created = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[bytes, float] | None:
+        """(value, stored_at) or None."""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, stored_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            now = time.time()
+            if now - row[2] > self.touch_interval:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as exc:
+            logger.warning("Disk cache read failed for %s: %s", key, exc)
+            self._stats["errors"] += 1
+            return None
+        self._stats["hits"] += 1
+        return row[0], row[1]
+
+    def set(self, key: str, value: bytes, stored_at: float | None = None) -> None:
+        now = time.time()
+        stored_at = now if stored_at is None else stored_at
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), stored_at, now),
+                )
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                while total > self.max_bytes:
+                    victims = conn.execute(
+                        "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed_at LIMIT 16",
+                        (key,),
+                    ).fetchall()
+                    if not victims:
+                        break
+                    for victim, size in victims:
+                        conn.execute("DELETE FROM entries WHERE key = ?", (victim,))
+                        self._stats["evictions"] += 1
+                        total -= size
+                        if total <= self.max_bytes:
+                            break
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as exc:
+            logger.warning("Disk cache write failed for %s: %s", key, exc)
+            self._stats["errors"] += 1
+            return
+        self._stats["writes"] += 1
+
+    def stats(self) -> dict:
+        """Per-process counters plus current (shared) occupancy, once the store has been opened."""
+        entries, size = None, None
+        if self._created:
+            try:
+                entries, size = self._conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        return {
+            "hits": self._stats["hits"],
+            "misses": self._stats["misses"],
+            "writes": self._stats["writes"],
+            "evictions": self._stats["evictions"],
+            "errors": self._stats["errors"],
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -1,43 +1,118 @@
 """
 BTC Allocation Lab 2.0 – FastAPI backend
-Stub optimizer + real market data via yfinance.
+Constrained mean-variance optimizer + real market data via yfinance.
 NOT financial advice.
 """
 
 from __future__ import annotations
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import hashlib
 import logging
 import math
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Annotated, Iterator, Literal
 
 import numpy as np
-import pandas as pd
-import requests_cache
-import yfinance as yf
-from cachetools import TTLCache
-from curl_cffi import requests as curl_requests
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from cachetools import LRUCache, TTLCache
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from . import metrics, wire
+from .backtest import period_ends, run_calendar, run_threshold, summarize
+from .covariance import ESTIMATORS, CovarianceEngine
+from .diskcache import DiskLRU
+from .downsample import downsample
+from .memo import ResultMemo
+from .metrics import MetricsMiddleware, stage
+from .optimizer import critical_line, feasible_caps, solve_qp, weights_at
+from .panel import PanelSnapshot, PricePanel
+from .providers import PROVIDERS, AssetParams, LocalFileProvider, Provider, SyntheticProvider, YahooProvider
+from .risk import (
+    TRADING_DAYS, ReturnsMatrix, euler_contributions, portfolio_risk, portfolio_risk_batch, returns_matrix,
+)
+from .rolling import RollingIndex, correlation_from_covariance
+from .seriesindex import SeriesIndex
+from .simulate import SimSpec, simulate, terminal_histogram, wealth_percentiles
+from .singleflight import SingleFlight
+from .warmer import CacheWarmer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger("btc-lab")
 
-# ── HTTP-level cache (disk, SQLite) + browser-impersonating session ───────────
-# requests_cache stores raw HTTP responses for 24 h so yfinance barely
-# touches Yahoo Finance on repeated restarts.
+# ── On-disk state ─────────────────────────────────────────────────────────────
+# Price panel and shared history store; created on first write, not at import.
+# pandas, yfinance and curl_cffi are likewise imported on first use, so
+# importing this module (worker boot, --reload) stays cheap.
 _CACHE_DIR = Path(__file__).parent.parent / ".yf_cache"
-_CACHE_DIR.mkdir(exist_ok=True)
-
-_http_session = requests_cache.CachedSession(
-    cache_name=str(_CACHE_DIR / "yf_http"),
-    backend="sqlite",
-    expire_after=86_400,          # 24-hour HTTP cache
-)
-# Wrap with curl_cffi for Chrome impersonation (bypasses Yahoo rate-limits)
-_curl_session = curl_requests.Session(impersonate="chrome")
 
-app = FastAPI(title="BTC Allocation Lab API", version="2.0.0")
+# Background preload at startup (provider data, pandas, covariance); 0 = all on first use
+_PRELOAD = os.environ.get("BTC_LAB_PRELOAD", "1") == "1"
+# Opt-in background cache warmer: BTC_LAB_WARM_CACHE=1
+_WARM_CACHE = os.environ.get("BTC_LAB_WARM_CACHE", "0") == "1"
+# Upper bound on parallel upstream downloads / warm-up workers
+_FETCH_CONCURRENCY = int(os.environ.get("BTC_LAB_FETCH_CONCURRENCY", "4"))
+# Covariance behind the optimizer / frontier / risk decomposition:
+# model (ASSET_META assumptions) | sample | ledoit_wolf | ewma, over a history range
+_COV_ESTIMATOR = os.environ.get("BTC_LAB_COV_ESTIMATOR", "ledoit_wolf")
+_COV_RANGE = os.environ.get("BTC_LAB_COV_RANGE", "3y")
+# Worker processes for /simulate (0 = run chunks in the request thread)
+_SIM_PROCESSES = int(os.environ.get("BTC_LAB_SIM_PROCESSES", "0"))
+# Memoized /optimize + /frontier responses (entries)
+_RESULT_CACHE_SIZE = int(os.environ.get("BTC_LAB_RESULT_CACHE_SIZE", "4096"))
+# Opt-in: solve the whole slider lattice in the background at startup
+_PRECOMPUTE_LATTICE = os.environ.get("BTC_LAB_PRECOMPUTE_LATTICE", "0") == "1"
+# Market-data provider: yfinance | local (BTC_LAB_DATA_PATH) | synthetic
+_PROVIDER = os.environ.get("BTC_LAB_PROVIDER", "yfinance")
+_DATA_PATH = os.environ.get("BTC_LAB_DATA_PATH", "")
+_SYNTHETIC_SEED = int(os.environ.get("BTC_LAB_SYNTHETIC_SEED", "0"))
+_SYNTHETIC_START = date.fromisoformat(os.environ.get("BTC_LAB_SYNTHETIC_START", "2010-01-01"))
+# Prometheus /metrics and stage timers (0 = off, near-zero overhead)
+_METRICS = os.environ.get("BTC_LAB_METRICS", "1") == "1"
+# Honour the X-BTC-Lab-Profile: 1 request header with a Server-Timing breakdown
+_PROFILING = os.environ.get("BTC_LAB_PROFILING", "0") == "1"
+metrics.configure(_METRICS, profiling=_PROFILING)
+if _PROVIDER not in PROVIDERS:
+    raise ValueError(f"BTC_LAB_PROVIDER must be one of {', '.join(PROVIDERS)}")
+if _PROVIDER == "local" and not _DATA_PATH:
+    raise ValueError("BTC_LAB_PROVIDER=local needs BTC_LAB_DATA_PATH (a CSV/Parquet file or directory)")
+if _COV_ESTIMATOR not in ("model", *ESTIMATORS):
+    raise ValueError(f"BTC_LAB_COV_ESTIMATOR must be one of model, {', '.join(ESTIMATORS)}")
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    _startup["ready_s"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+    if _PRELOAD:
+        threading.Thread(target=_preload, name="preload", daemon=True).start()
+    if _WARM_CACHE:
+        _warmer.start()
+    if _PRECOMPUTE_LATTICE:
+        threading.Thread(target=_precompute_lattice, name="lattice-precompute", daemon=True).start()
+    yield
+    _warmer.stop()
+    _lattice_stop.set()
+    if _sim_pool is not None:
+        _sim_pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="BTC Allocation Lab API", version="2.0.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,7 +120,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+if _METRICS:
+    app.add_middleware(MetricsMiddleware)
 
 
 # ── Shared ticker meta ────────────────────────────────────────────────────────
@@ -78,6 +156,56 @@ ASSET_META: dict[str, dict] = {
 }
 
 
+# ── Market model (expected returns + covariance) ──────────────────────────────
+
+UNIVERSE: list[str] = list(ASSET_META.keys())
+
+# Long-run correlation assumptions between asset classes (symmetric).
+_CLASS_CORR: dict[tuple[str, str], float] = {
+    ("equity", "equity"): 0.90,
+    ("equity", "intl_equity"): 0.80,
+    ("equity", "fixed_income"): 0.05,
+    ("equity", "commodity"): 0.30,
+    ("equity", "reit"): 0.70,
+    ("equity", "crypto"): 0.30,
+    ("intl_equity", "intl_equity"): 0.85,
+    ("intl_equity", "fixed_income"): 0.05,
+    ("intl_equity", "commodity"): 0.35,
+    ("intl_equity", "reit"): 0.60,
+    ("intl_equity", "crypto"): 0.25,
+    ("fixed_income", "fixed_income"): 0.60,
+    ("fixed_income", "commodity"): 0.00,
+    ("fixed_income", "reit"): 0.30,
+    ("fixed_income", "crypto"): 0.05,
+    ("commodity", "commodity"): 0.50,
+    ("commodity", "reit"): 0.25,
+    ("commodity", "crypto"): 0.15,
+    ("reit", "reit"): 1.00,
+    ("reit", "crypto"): 0.20,
+    ("crypto", "crypto"): 0.80,
+}
+
+
+def _class_corr(a: str, b: str) -> float:
+    if a == "cash" or b == "cash":
+        return 0.0
+    return _CLASS_CORR.get((a, b), _CLASS_CORR.get((b, a), 0.0))
+
+
+def _build_market_model() -> tuple[np.ndarray, np.ndarray]:
+    """Expected returns and covariance over UNIVERSE from ASSET_META assumptions."""
+    classes = [ASSET_META[t]["asset_class"] for t in UNIVERSE]
+    vols = np.array([ASSET_META[t]["vol"] for t in UNIVERSE])
+    corr = np.array([[_class_corr(a, b) for b in classes] for a in classes])
+    np.fill_diagonal(corr, 1.0)
+    cov = corr * np.outer(vols, vols)
+    mu = np.array([ASSET_META[t]["expected_ret"] for t in UNIVERSE])
+    return mu, cov
+
+
+EXPECTED_RETURNS, COVARIANCE = _build_market_model()
+
+
 # ── Optimize schemas ──────────────────────────────────────────────────────────
 
 class OptimizeRequest(BaseModel):
@@ -85,6 +213,7 @@ class OptimizeRequest(BaseModel):
     btc_max: float = Field(0.15, ge=0.0, le=0.3)
     cash_max: float = Field(0.20, ge=0.0, le=0.3)
     per_asset_max: float = Field(0.35, ge=0.05, le=0.4)
+    risk_range: Literal["1y", "3y", "5y", "max"] = "3y"
 
 
 class AssetWeight(BaseModel):
@@ -106,7 +235,9 @@ class RiskMetrics(BaseModel):
 
 class RiskContribution(BaseModel):
     ticker: str
-    contribution_pct: float  # 0–100
+    contribution_pct: float      # share of portfolio vol, %; Euler components sum to 100
+    var_contribution_pct: float  # share of 1-day VaR95, %
+    es_contribution_pct: float   # share of 1-day ES95, %
 
 
 class ConstraintsSummary(BaseModel):
@@ -164,28 +295,81 @@ PROFILE_STUBS: dict[str, dict] = {
 }
 
 
-def _apply_constraints(
-    base_weights: dict[str, float],
-    btc_max: float,
-    cash_max: float,
-    per_asset_max: float,
-) -> list[dict]:
-    clamped: dict[str, float] = {}
-    for ticker, wt in base_weights.items():
-        meta = ASSET_META.get(ticker, {})
+# Risk aversion λ in  max μᵀw − ½·λ·wᵀΣw  per profile
+RISK_AVERSION: dict[str, float] = {
+    "conservative": 12.0,
+    "balanced": 6.0,
+    "growth": 3.0,
+}
+
+SLIDER_STEP = 0.01          # caps are quantized to the UI slider resolution
+# The UI slider lattice in steps: per_asset_max 0.05–0.40, cash_max / btc_max 0–0.30
+SLIDER_LATTICE = (range(5, 41), range(0, 31), range(0, 31))
+
+# Last solution per profile — warm start for the next (usually nearby) request
+_warm_starts: dict[str, np.ndarray] = {}
+
+# Solved (weights, effective per-asset cap) per profile and caps in slider
+# steps, for the covariance they were solved with. Sized for the full lattice.
+_solutions = ResultMemo(maxsize=len(RISK_AVERSION) * math.prod(map(len, SLIDER_LATTICE)))
+
+
+def _slider_steps(btc_max: float, cash_max: float, per_asset_max: float) -> tuple[int, int, int]:
+    """Caps (btc, cash, per-asset) as whole slider steps."""
+    return tuple(int(round(v / SLIDER_STEP)) for v in (btc_max, cash_max, per_asset_max))
+
+
+def _upper_bounds(btc_max: float, cash_max: float, per_asset_max: float) -> tuple[np.ndarray, float]:
+    """Per-ticker upper bounds over UNIVERSE, plus the effective per-asset cap."""
+    caps = np.ones(len(UNIVERSE))
+    for i, ticker in enumerate(UNIVERSE):
         if ticker == "BTC":
-            wt = min(wt, btc_max)
-        if meta.get("asset_class") == "cash":
-            wt = min(wt, cash_max)
-        wt = min(wt, per_asset_max)
-        clamped[ticker] = wt
+            caps[i] = btc_max
+        if ASSET_META[ticker]["asset_class"] == "cash":
+            caps[i] = min(caps[i], cash_max)
+    return feasible_caps(caps, per_asset_max)
+
+
+def _base_weights(profile: str) -> np.ndarray:
+    base = PROFILE_STUBS[profile]["base_weights"]
+    return np.array([base.get(t, 0.0) for t in UNIVERSE])
+
+
+def _solve_quantized(
+    profile: str, steps: tuple[int, int, int], cov: np.ndarray, w0: np.ndarray, bypass: bool = False,
+) -> tuple[np.ndarray, float, bool]:
+    """
+    Optimal weights over UNIVERSE for caps given in slider steps (btc, cash,
+    per-asset), memoized, else solved warm-started at `w0`. Returns
+    (weights, effective per-asset cap, solved now).
+    """
+    solved = False
+
+    def solve() -> tuple[np.ndarray, float]:
+        nonlocal solved
+        solved = True
+        ub, cap = _upper_bounds(*(s * SLIDER_STEP for s in steps))
+        result = solve_qp(RISK_AVERSION[profile] * cov, EXPECTED_RETURNS, ub, w0=w0)
+        if not result.converged:
+            logger.warning("Optimizer hit iteration limit for %s (%d iterations)", profile, result.iterations)
+        return result.weights, cap
 
-    total = sum(clamped.values())
-    if total > 0:
-        clamped = {t: w / total for t, w in clamped.items()}
+    w, cap = _solutions.get((profile, *steps), (cov,), solve, bypass=bypass)
+    return w, cap, solved
 
+
+def _solve_profile(profile: str, steps: tuple[int, int, int], bypass: bool = False) -> tuple[np.ndarray, float]:
+    """Optimal weights and effective per-asset cap, warm-started from the profile's last solution."""
+    w0 = _warm_starts.get(profile)
+    w, cap, _ = _solve_quantized(profile, steps, _covariance(), _base_weights(profile) if w0 is None else w0, bypass)
+    _warm_starts[profile] = w
+    return w, cap
+
+
+def _weights_payload(w: np.ndarray) -> list[dict]:
     result = []
-    for ticker, weight in sorted(clamped.items(), key=lambda x: -x[1]):
+    for i in np.argsort(-w, kind="stable"):
+        ticker, weight = UNIVERSE[i], float(w[i])
         if weight > 0.001:
             meta = ASSET_META.get(ticker, {})
             result.append({
@@ -197,17 +381,82 @@ def _apply_constraints(
     return result
 
 
-def _risk_contributions(weights: list[dict]) -> list[RiskContribution]:
-    """Simplified risk contribution: weight * vol^2 as proxy for marginal contrib."""
-    rc = []
-    for w in weights:
-        meta = ASSET_META.get(w["ticker"], {})
-        vol = meta.get("vol", 0.15)
-        rc.append((w["ticker"], w["weight"] * vol ** 2))
-    total_rc = sum(v for _, v in rc) or 1
+# ── Historical risk ───────────────────────────────────────────────────────────
+
+RISK_BENCHMARK = "SPY"
+
+# Returns matrix over UNIVERSE per range, tied to the panel snapshot it was built from
+_risk_inputs: dict[str, tuple[PanelSnapshot, ReturnsMatrix]] = {}
+
+
+def _returns_for(range_key: str) -> ReturnsMatrix | None:
+    snap = _panel.snapshot()
+    held = _risk_inputs.get(range_key)
+    if held is not None and held[0] is snap:
+        return held[1]
+    if snap.last_valid(RISK_BENCHMARK) is None:
+        # Cold panel: fill it in the background, reference values until then.
+        _revalidate(RISK_BENCHMARK)
+        return None
+    years = RANGE_MAP[range_key]
+    start = None if years is None else snap.dates[-1] - np.timedelta64(int(years * 365.25), "D")
+    matrix = returns_matrix(snap, tuple(UNIVERSE), RISK_BENCHMARK, start)
+    _risk_inputs[range_key] = (snap, matrix)
+    return matrix
+
+
+_covariance_engine = CovarianceEngine()
+
+
+def _covariance(estimator: str | None = None, range_key: str | None = None) -> np.ndarray:
+    """
+    Annualised covariance over UNIVERSE from the configured estimator and range.
+    Falls back to the ASSET_META model until the panel has history.
+    """
+    estimator = estimator or _COV_ESTIMATOR
+    if estimator == "model":
+        return COVARIANCE
+    range_key = range_key or _COV_RANGE
+    matrix = _returns_for(range_key)
+    if matrix is None:
+        return COVARIANCE
+    try:
+        return _covariance_engine.estimate((tuple(UNIVERSE), range_key), matrix, estimator)
+    except ValueError as exc:
+        logger.warning("Covariance estimate unavailable (%s); using model", exc)
+        return COVARIANCE
+
+
+def _risk_metrics(profile: str, w: np.ndarray, range_key: str) -> RiskMetrics:
+    """Realised risk of weights `w` over the range; profile reference values if no data."""
+    matrix = _returns_for(range_key)
+    risk = portfolio_risk(matrix, w, RISK_FREE_RATE) if matrix is not None else None
+    if risk is None:
+        return RiskMetrics(**PROFILE_STUBS[profile]["risk"])
+    return RiskMetrics(**{k: round(v, 4) for k, v in risk.items()})
+
+
+def _pct(components: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Components as % of their (row) total; 0 where the total is 0."""
+    total = np.where(np.abs(total) > 1e-15, total, np.inf)
+    return components / total[:, None] * 100
+
+
+def _risk_contributions(w: np.ndarray, range_key: str) -> list[RiskContribution]:
+    """Euler vol / VaR / ES contributions of the held assets, largest vol share first."""
+    euler = euler_contributions(_returns_for(range_key), COVARIANCE, w[None, :])
+    vol_pct = _pct(euler["vol_c"], euler["vol"])[0]
+    var_pct = _pct(euler["var_c"], euler["var"])[0]
+    es_pct = _pct(euler["es_c"], euler["es"])[0]
     return [
-        RiskContribution(ticker=t, contribution_pct=round(v / total_rc * 100, 1))
-        for t, v in sorted(rc, key=lambda x: -x[1])
+        RiskContribution(
+            ticker=UNIVERSE[i],
+            contribution_pct=round(float(vol_pct[i]), 1),
+            var_contribution_pct=round(float(var_pct[i]), 1),
+            es_contribution_pct=round(float(es_pct[i]), 1),
+        )
+        for i in np.argsort(-vol_pct, kind="stable")
+        if w[i] > 0.001
     ]
 
 
@@ -215,25 +464,149 @@ def _risk_contributions(weights: list[dict]) -> list[RiskContribution]:
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "version": "2.0.0"}
+    return {
+        "status": "ok",
+        "version": "2.0.0",
+        "provider": {"name": _provider.name, "label": _provider.label},
+        "startup": dict(_startup),
+        "history_cache": dict(_history_stats),
+        "stale_store": _stale_store.stats(),
+        "warmer": _warmer.status() if _WARM_CACHE else {"state": "disabled"},
+        "covariance": {"estimator": _COV_ESTIMATOR, "range": _COV_RANGE, **_covariance_engine.stats()},
+        "result_cache": _results.stats(),
+        "solutions": {**_solutions.stats(), "lattice": dict(_lattice_state)},
+    }
+
+
+@metrics.collector
+def _cache_metrics():
+    l1, l2 = _history_stats, _stale_store.stats()
+    caches = {
+        "history_l1": {
+            "hit": l1["hits"], "miss": l1["l1_misses"],
+            "stale": l1["l1_expired"], "eviction": l1["l1_evictions"],
+        },
+        "stale_store": {
+            "hit": l2["hits"], "miss": l2["misses"],
+            "stale": l1["stale_while_revalidate"] + l1["stale_served"], "eviction": l2["evictions"],
+        },
+    }
+    yield (
+        "btc_lab_cache_events_total", "counter", "History cache lookups by outcome, and evictions",
+        [({"cache": c, "event": e}, v) for c, events in caches.items() for e, v in events.items()],
+    )
+    yield (
+        "btc_lab_history_events_total", "counter", "History pipeline events (as in /health history_cache)",
+        [({"event": k}, v) for k, v in sorted(l1.items())],
+    )
+    yield ("btc_lab_stale_store_bytes", "gauge", "Bytes held by the shared history store", [({}, l2["bytes"] or 0)])
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    """Prometheus text exposition of every counter, gauge and histogram."""
+    if not _METRICS:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (BTC_LAB_METRICS=0).")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Whole /optimize and /frontier responses per quantized request
+_results = ResultMemo(maxsize=_RESULT_CACHE_SIZE)
+
+
+def _market_inputs() -> tuple:
+    """What every memoized result depends on: the panel snapshot and the covariance estimate."""
+    return _panel.snapshot(), _covariance()
 
 
 @app.post("/optimize", response_model=OptimizeResponse)
-def optimize(req: OptimizeRequest) -> OptimizeResponse:
-    stub = PROFILE_STUBS[req.profile]
-    weights = _apply_constraints(
-        stub["base_weights"], req.btc_max, req.cash_max, req.per_asset_max
-    )
-    return OptimizeResponse(
-        weights=[AssetWeight(**w) for w in weights],
-        risk_metrics=RiskMetrics(**stub["risk"]),
-        constraints_summary=ConstraintsSummary(
-            cash_cap=req.cash_max,
-            btc_cap=req.btc_max,
-            per_asset_cap=req.per_asset_max,
-            budgets_profile=req.profile,
-        ),
-        risk_contributions=_risk_contributions(weights),
+def optimize(req: OptimizeRequest, bypass_cache: bool = False) -> OptimizeResponse:
+    """
+    Caps are quantized to the slider step. Responses are memoized per
+    (profile, caps, risk_range) until market data changes; `bypass_cache`
+    recomputes from scratch (benchmarking).
+    """
+    steps = _slider_steps(req.btc_max, req.cash_max, req.per_asset_max)
+
+    def compute() -> OptimizeResponse:
+        optimal, per_asset_cap = _solve_profile(req.profile, steps, bypass=bypass_cache)
+        with stage("stats"):
+            risk = _risk_metrics(req.profile, optimal, req.risk_range)
+            contributions = _risk_contributions(optimal, req.risk_range)
+        with stage("model"):
+            return OptimizeResponse(
+                weights=[AssetWeight(**w) for w in _weights_payload(optimal)],
+                risk_metrics=risk,
+                constraints_summary=ConstraintsSummary(
+                    cash_cap=round(steps[1] * SLIDER_STEP, 2),
+                    btc_cap=round(steps[0] * SLIDER_STEP, 2),
+                    per_asset_cap=round(per_asset_cap, 4),
+                    budgets_profile=req.profile,
+                ),
+                risk_contributions=contributions,
+            )
+
+    key = ("optimize", req.profile, *steps, req.risk_range)
+    return _results.get(key, _market_inputs(), compute, bypass=bypass_cache)
+
+
+# ── Risk-contribution endpoint ────────────────────────────────────────────────
+
+MAX_BATCH_PORTFOLIOS = 1000
+
+
+class RiskContributionsRequest(BaseModel):
+    portfolios: list[dict[str, float]] = Field(..., min_length=1, max_length=MAX_BATCH_PORTFOLIOS)
+    risk_range: Literal["1y", "3y", "5y", "max"] = "3y"
+
+
+class PortfolioRisk(BaseModel):
+    vol_annual: float
+    var95: float
+    es95: float
+    vol_pct: list[float]   # aligned with RiskContributionsResponse.tickers
+    var_pct: list[float]
+    es_pct: list[float]
+
+
+class RiskContributionsResponse(BaseModel):
+    tickers: list[str]
+    portfolios: list[PortfolioRisk]
+
+
+@app.post("/risk-contributions", response_model=RiskContributionsResponse)
+def risk_contributions(req: RiskContributionsRequest) -> RiskContributionsResponse:
+    """
+    Euler vol / VaR / ES decomposition for many weight vectors at once
+    (e.g. every stop of a slider), evaluated as one batch.
+    """
+    col = {t: i for i, t in enumerate(UNIVERSE)}
+    W = np.zeros((len(req.portfolios), len(UNIVERSE)))
+    for b, portfolio in enumerate(req.portfolios):
+        for ticker, weight in portfolio.items():
+            i = col.get(ticker.upper())
+            if i is None:
+                raise HTTPException(status_code=400, detail=f"Unknown ticker '{ticker}' in portfolio {b}.")
+            W[b, i] = weight
+
+    euler = euler_contributions(_returns_for(req.risk_range), COVARIANCE, W)
+    cols = np.flatnonzero((W != 0).any(axis=0))
+    vol_pct = np.round(_pct(euler["vol_c"], euler["vol"])[:, cols], 1)
+    var_pct = np.round(_pct(euler["var_c"], euler["var"])[:, cols], 1)
+    es_pct = np.round(_pct(euler["es_c"], euler["es"])[:, cols], 1)
+    return RiskContributionsResponse(
+        tickers=[UNIVERSE[i] for i in cols],
+        portfolios=[
+            PortfolioRisk(
+                vol_annual=round(float(euler["vol"][b]), 4),
+                var95=round(float(euler["var"][b]), 4),
+                es95=round(float(euler["es"][b]), 4),
+                vol_pct=vol_pct[b].tolist(),
+                var_pct=var_pct[b].tolist(),
+                es_pct=es_pct[b].tolist(),
+            )
+            for b in range(len(W))
+        ],
     )
 
 
@@ -260,70 +633,610 @@ class FrontierResponse(BaseModel):
 
 # ── Frontier endpoint ─────────────────────────────────────────────────────────
 
+RISK_FREE_RATE = 0.043  # approx current T-bill yield
+FRONTIER_POINTS = 60
+
+# Last min-variance portfolio — warm start for the next frontier trace
+_minvar_warm: np.ndarray | None = None
+
+
+def _max_sharpe_on_segments(W: np.ndarray, mu: np.ndarray, cov: np.ndarray, rf: float) -> np.ndarray:
+    """
+    Exact max-Sharpe portfolio on the piecewise-linear frontier through W's rows.
+    On a segment w(s) = W_k + s·Δ, Sharpe(s) = (p + q·s) / √(A + 2B·s + C·s²)
+    has a single stationary point, so each segment is solved in closed form.
+    """
+    if len(W) == 1:
+        return W[0]
+    W0, D = W[:-1], np.diff(W, axis=0)
+    p = W0 @ mu - rf
+    q = D @ mu
+    A = np.einsum("ij,jk,ik->i", W0, cov, W0)
+    B = np.einsum("ij,jk,ik->i", W0, cov, D)
+    C = np.einsum("ij,jk,ik->i", D, cov, D)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s_star = np.nan_to_num((p * B - q * A) / (q * B - p * C), nan=0.0)
+    cand = np.stack([np.zeros_like(p), np.ones_like(p), np.clip(s_star, 0.0, 1.0)], axis=1)
+    sharpe = (p[:, None] + q[:, None] * cand) / np.sqrt(
+        np.maximum(A[:, None] + 2 * B[:, None] * cand + C[:, None] * cand ** 2, 1e-18)
+    )
+    k, j = np.unravel_index(int(np.argmax(sharpe)), sharpe.shape)
+    return W0[k] + cand[k, j] * D[k]
+
+
 @app.post("/frontier", response_model=FrontierResponse)
-def frontier(req: OptimizeRequest) -> FrontierResponse:
-    """
-    Generate a plausible efficient frontier using a closed-form approximation.
-    This is educational / illustrative only.
-    """
-    rng = np.random.default_rng(42)
-    rf = 0.043  # risk-free rate (approx current)
-
-    # Frontier: parabolic in (vol, ret) space
-    # min-var ~5-8% vol depending on profile; grows concavely
-    profile_offset = {"conservative": 0.0, "balanced": 0.03, "growth": 0.06}
-    base_min_vol = 0.055 + profile_offset[req.profile]
-
-    n = 60
-    vols = np.linspace(base_min_vol, 0.40, n)
-    # Diminishing-returns shape: ret = a + b*ln(vol / min_vol)
-    a = 0.046 + profile_offset[req.profile] * 0.5
-    b = 0.042
-    rets = a + b * np.log(vols / base_min_vol)
-    rets = np.clip(rets, 0.01, 0.30)
-
-    # Add tiny noise for visual texture
-    noise = rng.normal(0, 0.0015, n)
-    rets_noisy = np.clip(rets + noise, 0.01, 0.30)
-
-    frontier_pts = [
-        FrontierPoint(
-            vol=round(float(v), 4),
-            ret=round(float(r), 4),
-            sharpe=round((float(r) - rf) / float(v), 3),
+def frontier(req: OptimizeRequest, bypass_cache: bool = False) -> FrontierResponse:
+    """
+    Exact efficient frontier under the request's caps (quantized to the
+    slider step, memoized like /optimize).
+    One critical-line trace yields every turning point; the 60 frontier points
+    (evenly spaced in return), the landmarks and the profile's portfolio are
+    all interpolated from it.
+    """
+    steps = _slider_steps(req.btc_max, req.cash_max, req.per_asset_max)
+    key = ("frontier", req.profile, *steps)
+    return _results.get(key, _market_inputs(), lambda: _trace_frontier(req.profile, steps), bypass=bypass_cache)
+
+
+def _trace_frontier(profile: str, steps: tuple[int, int, int]) -> FrontierResponse:
+    global _minvar_warm
+    mu, cov, rf = EXPECTED_RETURNS, _covariance(), RISK_FREE_RATE
+    ub, _ = _upper_bounds(*(s * SLIDER_STEP for s in steps))
+    cl = critical_line(cov, mu, ub, w_minvar=_minvar_warm)
+    _minvar_warm = cl.weights[0]
+
+    # Turning points with distinct returns (vertices can repeat a point)
+    rets_tp = cl.weights @ mu
+    keep = np.r_[True, np.diff(rets_tp) > 1e-12]
+    W, r_tp = cl.weights[keep], rets_tp[keep]
+
+    if len(W) == 1:
+        weights = np.repeat(W, FRONTIER_POINTS, axis=0)
+    else:
+        targets = np.linspace(r_tp[0], r_tp[-1], FRONTIER_POINTS)
+        idx = np.clip(np.searchsorted(r_tp, targets) - 1, 0, len(W) - 2)
+        s = (targets - r_tp[idx]) / (r_tp[idx + 1] - r_tp[idx])
+        weights = W[idx] + s[:, None] * (W[idx + 1] - W[idx])
+
+    rets = weights @ mu
+    vols = np.sqrt(np.einsum("ij,jk,ik->i", weights, cov, weights))
+    current = weights_at(cl, 1.0 / RISK_AVERSION[profile])
+    max_sharpe = _max_sharpe_on_segments(W, mu, cov, rf)
+
+    def _point(w: np.ndarray, label: str) -> SpecialPoint:
+        return SpecialPoint(
+            vol=round(float(np.sqrt(w @ cov @ w)), 4),
+            ret=round(float(w @ mu), 4),
+            label=label,
         )
-        for v, r in zip(vols, rets_noisy)
-    ]
 
-    # Named landmarks
-    min_var = SpecialPoint(
-        vol=round(float(vols[0]), 4),
-        ret=round(float(rets_noisy[0]), 4),
-        label="Min Variance",
-    )
-    sharpe_idx = int(np.argmax((rets_noisy - rf) / vols))
-    max_sharpe = SpecialPoint(
-        vol=round(float(vols[sharpe_idx]), 4),
-        ret=round(float(rets_noisy[sharpe_idx]), 4),
-        label="Max Sharpe",
-    )
+    with stage("model"):
+        return FrontierResponse(
+            frontier=[
+                FrontierPoint(
+                    vol=round(float(v), 4),
+                    ret=round(float(r), 4),
+                    sharpe=round((float(r) - rf) / float(v), 3),
+                )
+                for v, r in zip(vols, rets)
+            ],
+            current=_point(current, "Your Portfolio"),
+            min_var=_point(W[0], "Min Variance"),
+            max_sharpe=_point(max_sharpe, "Max Sharpe"),
+        )
+
+
+# ── Constraint sweep endpoint ─────────────────────────────────────────────────
+
+MAX_SWEEP_CELLS = 2000
+
+BtcCap = Annotated[float, Field(ge=0.0, le=0.3)]
+CashCap = Annotated[float, Field(ge=0.0, le=0.3)]
+AssetCap = Annotated[float, Field(ge=0.05, le=0.4)]
+
+
+class SweepRequest(BaseModel):
+    profile: Literal["conservative", "balanced", "growth"]
+    btc_max: list[BtcCap] = Field(..., min_length=1, max_length=31)
+    cash_max: list[CashCap] = Field(..., min_length=1, max_length=31)
+    per_asset_max: list[AssetCap] = Field(..., min_length=1, max_length=36)
+    risk_range: Literal["1y", "3y", "5y", "max"] = "3y"
+
+
+class SweepResponse(BaseModel):
+    profile: str
+    # Grid axes (quantized, sorted, unique); cells are row-major over
+    # (per_asset_max, cash_max, btc_max), i.e. btc_max varies fastest.
+    per_asset_max: list[float]
+    cash_max: list[float]
+    btc_max: list[float]
+    tickers: list[str]                 # assets held in any cell
+    weights: list[list[float]]         # (cells, tickers)
+    per_asset_cap: list[float]         # effective cap per cell (raised if infeasible)
+    metrics: dict[str, list[float]]    # per cell; realised metrics only with price history
+    solved: int                        # cells solved by this request (rest from the memo)
+
 
-    # Current portfolio from stub
-    stub_risk = PROFILE_STUBS[req.profile]["risk"]
-    current_vol = stub_risk["vol_annual"]
-    current_ret = a + b * math.log(max(current_vol, base_min_vol) / base_min_vol)
-    current = SpecialPoint(
-        vol=round(current_vol, 4),
-        ret=round(current_ret, 4),
-        label="Your Portfolio",
+def _quantize(values: list[float]) -> list[int]:
+    """Slider steps, sorted and de-duplicated."""
+    return sorted({int(round(v / SLIDER_STEP)) for v in values})
+
+
+def _snake_order(shape: tuple[int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Grid cells in boustrophedon order: every inner sweep reverses direction,
+    so consecutive cells differ by one step along a single axis.
+    """
+    P, C, B = shape
+    cells, row = [], 0
+    for i in range(P):
+        for j in (range(C) if i % 2 == 0 else range(C - 1, -1, -1)):
+            ks = range(B) if row % 2 == 0 else range(B - 1, -1, -1)
+            cells.extend((i, j, k) for k in ks)
+            row += 1
+    return cells
+
+
+@app.post("/sweep", responses={200: {"model": SweepResponse}})
+def sweep(req: SweepRequest) -> Response:
+    """
+    Optimal weights and risk metrics for every (per_asset_max, cash_max,
+    btc_max) cell of a grid, for one profile. Cells are visited in snake
+    order so each solve is warm-started from a neighbour one slider step
+    away; solutions are memoized per quantized caps.
+    """
+    axes = _quantize(req.per_asset_max), _quantize(req.cash_max), _quantize(req.btc_max)
+    shape = (len(axes[0]), len(axes[1]), len(axes[2]))
+    n_cells = shape[0] * shape[1] * shape[2]
+    if n_cells > MAX_SWEEP_CELLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_CELLS} grid cells.")
+
+    cov = _covariance()
+    w = _base_weights(req.profile)
+    W = np.empty((n_cells, len(UNIVERSE)))
+    caps = np.empty(n_cells)
+    solved = 0
+    for i, j, k in _snake_order(shape):
+        cell = (i * shape[1] + j) * shape[2] + k
+        w, caps[cell], fresh = _solve_quantized(req.profile, (axes[2][k], axes[1][j], axes[0][i]), cov, w)
+        W[cell] = w
+        solved += fresh
+
+    rets = W @ EXPECTED_RETURNS
+    vols = np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", W, cov, W), 0.0))
+    cell_metrics = {
+        "expected_return": rets,
+        "vol_model": vols,
+        "sharpe_model": np.divide(rets - RISK_FREE_RATE, vols, out=np.zeros_like(vols), where=vols > 0),
+    }
+    matrix = _returns_for(req.risk_range)
+    realised = portfolio_risk_batch(matrix, W, RISK_FREE_RATE) if matrix is not None else None
+    if realised is not None:
+        cell_metrics.update(realised)
+
+    held = np.flatnonzero((W > 0.001).any(axis=0))
+    with stage("serialize"):
+        body = orjson.dumps(
+            {
+                "profile": req.profile,
+                "per_asset_max": [round(s * SLIDER_STEP, 2) for s in axes[0]],
+                "cash_max": [round(s * SLIDER_STEP, 2) for s in axes[1]],
+                "btc_max": [round(s * SLIDER_STEP, 2) for s in axes[2]],
+                "tickers": [UNIVERSE[i] for i in held],
+                "weights": np.ascontiguousarray(np.round(W[:, held], 4)),
+                "per_asset_cap": np.round(caps, 4),
+                "metrics": {name: np.round(v, 4) for name, v in cell_metrics.items()},
+                "solved": solved,
+            },
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return Response(body, media_type="application/json")
+
+
+# ── Slider lattice precompute ─────────────────────────────────────────────────
+
+_LATTICE_RECHECK = 60        # seconds between checks for a new covariance estimate
+_lattice_stop = threading.Event()
+_lattice_state: dict = {"state": "enabled" if _PRECOMPUTE_LATTICE else "disabled"}
+
+
+def _fill_lattice(cov: np.ndarray) -> bool:
+    """Solve every lattice cell for every profile; False if interrupted."""
+    shape = tuple(map(len, SLIDER_LATTICE))
+    per_asset, cash, btc = SLIDER_LATTICE
+    for profile in RISK_AVERSION:
+        w = _base_weights(profile)
+        for n, (i, j, k) in enumerate(_snake_order(shape)):
+            # Stopping, or market data moved on: the caller starts over.
+            if n % 256 == 0 and (_lattice_stop.is_set() or _covariance() is not cov):
+                return False
+            w, _, _ = _solve_quantized(profile, (btc[k], cash[j], per_asset[i]), cov, w)
+            _lattice_state["cells"] += 1
+    return True
+
+
+def _precompute_lattice() -> None:
+    """
+    Keep the solution memo filled for the whole slider lattice (snake order,
+    warm-started), redoing it whenever the covariance estimate changes.
+    """
+    solved_for = None
+    while not _lattice_stop.is_set():
+        cov = _covariance()
+        if cov is not solved_for:
+            t0 = time.time()
+            _lattice_state.update(state="running", cells=0)
+            if _fill_lattice(cov):
+                solved_for = cov
+                _lattice_state.update(state="ready", seconds=round(time.time() - t0, 1))
+                logger.info("Slider lattice precomputed: %d cells in %.1fs", _lattice_state["cells"], time.time() - t0)
+            continue
+        _lattice_stop.wait(_LATTICE_RECHECK)
+
+
+# ── Simulation endpoint ───────────────────────────────────────────────────────
+
+# Fan-band quantiles reported at every month-end checkpoint
+SIM_QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+_sim_pool: ProcessPoolExecutor | None = None
+_sim_pool_lock = threading.Lock()
+
+
+def _simulation_pool() -> ProcessPoolExecutor | None:
+    global _sim_pool
+    if _SIM_PROCESSES <= 0:
+        return None
+    with _sim_pool_lock:
+        if _sim_pool is None:
+            # spawn: workers only import app.simulate, never fork the server's threads
+            _sim_pool = ProcessPoolExecutor(
+                max_workers=_SIM_PROCESSES, mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _sim_pool
+
+
+class SimulateRequest(OptimizeRequest):
+    method: Literal["bootstrap", "normal", "t"] = "bootstrap"
+    paths: int = Field(10_000, ge=100, le=100_000)
+    years: float = Field(10.0, gt=0.0, le=10.0)
+    block_days: float = Field(20.0, ge=1.0, le=250.0)   # bootstrap: mean block length
+    dof: float = Field(5.0, gt=2.0, le=100.0)           # t: degrees of freedom
+    loss_threshold: float = Field(0.2, gt=0.0, lt=1.0)
+    seed: int = Field(0, ge=0)
+
+
+class FanBand(BaseModel):
+    years: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+class TerminalBin(BaseModel):
+    wealth_lo: float
+    wealth_hi: float
+    prob: float
+
+
+class SimulateResponse(BaseModel):
+    method: str
+    paths: int
+    years: float
+    seed: int
+    weights: list[AssetWeight]
+    bands: list[FanBand]            # wealth multiple of the starting value
+    terminal: list[TerminalBin]
+    terminal_mean: float
+    prob_loss: float                # P(final wealth < 1 − loss_threshold)
+    prob_loss_anytime: float        # P(wealth dips below 1 − loss_threshold at any day)
+
+
+@app.post("/simulate", response_model=SimulateResponse)
+def simulate_portfolio(req: SimulateRequest) -> SimulateResponse:
+    """
+    Project the optimized portfolio forward: block bootstrap of its historical
+    daily returns over `risk_range`, or the normal / t model implied by
+    EXPECTED_RETURNS and the covariance engine.
+    """
+    w, _ = _solve_profile(req.profile, _slider_steps(req.btc_max, req.cash_max, req.per_asset_max))
+
+    steps = max(int(round(req.years * TRADING_DAYS)), 1)
+    checkpoints = np.unique(np.append(np.arange(21, steps + 1, 21), steps))
+    common = dict(method=req.method, steps=steps, checkpoints=checkpoints,
+                  loss_level=math.log1p(-req.loss_threshold))
+    if req.method == "bootstrap":
+        matrix = _returns_for(req.risk_range)
+        if matrix is None:
+            raise HTTPException(status_code=503, detail="Price history not loaded yet; try again shortly.")
+        start = int(matrix.first_row[w > 1e-4].max())
+        spec = SimSpec(**common, history=matrix.returns[start:] @ w, block=req.block_days)
+    else:
+        cov = _covariance()
+        spec = SimSpec(
+            **common,
+            mu=float(EXPECTED_RETURNS @ w) / TRADING_DAYS,
+            sigma=math.sqrt(float(w @ cov @ w) / TRADING_DAYS),
+            dof=req.dof,
+        )
+
+    result = simulate(spec, req.paths, req.seed, pool=_simulation_pool())
+
+    bands = wealth_percentiles(result.hist, np.array(SIM_QUANTILES))
+    edges, probs = terminal_histogram(result.hist[-1])
+    return SimulateResponse(
+        method=req.method,
+        paths=result.paths,
+        years=req.years,
+        seed=req.seed,
+        weights=[AssetWeight(**x) for x in _weights_payload(w)],
+        bands=[
+            FanBand(years=round(float(c) / TRADING_DAYS, 3), **{
+                f"p{round(q * 100)}": round(float(v), 4) for q, v in zip(SIM_QUANTILES, row)
+            })
+            for c, row in zip(checkpoints, bands)
+        ],
+        terminal=[
+            TerminalBin(wealth_lo=round(float(lo), 4), wealth_hi=round(float(hi), 4), prob=round(float(p), 5))
+            for lo, hi, p in zip(edges[:-1], edges[1:], probs)
+        ],
+        terminal_mean=round(result.terminal_sum / result.paths, 4),
+        prob_loss=round(result.loss_terminal / result.paths, 4),
+        prob_loss_anytime=round(result.loss_anytime / result.paths, 4),
     )
 
-    return FrontierResponse(
-        frontier=frontier_pts,
-        current=current,
-        min_var=min_var,
-        max_sharpe=max_sharpe,
+
+# ── Backtest endpoint ─────────────────────────────────────────────────────────
+
+MAX_BACKTEST_RUNS = 4000
+
+
+class RebalanceSchedule(BaseModel):
+    kind: Literal["none", "monthly", "quarterly", "threshold"] = "monthly"
+    band: float = Field(0.05, gt=0.0, lt=1.0)   # threshold: max |weight − target|
+
+    @property
+    def label(self) -> str:
+        return f"threshold:{self.band:g}" if self.kind == "threshold" else self.kind
+
+
+class BacktestRequest(BaseModel):
+    # A profile name (its reference weights) or a {ticker: weight} map, e.g. /optimize weights
+    portfolios: list[Literal["conservative", "balanced", "growth"] | dict[str, float]] = Field(
+        ..., min_length=1, max_length=1000,
+    )
+    schedules: list[RebalanceSchedule] = Field(
+        default_factory=lambda: [RebalanceSchedule(kind="none"), RebalanceSchedule(kind="monthly")],
+        min_length=1, max_length=8,
     )
+    range: Literal["1y", "3y", "5y", "max"] = "max"
+    cost_bps: float = Field(10.0, ge=0.0, le=500.0)
+    max_points: int = Field(250, ge=16, le=2000)
+
+
+class BacktestStats(BaseModel):
+    total_return: float
+    cagr: float
+    vol_annual: float
+    max_drawdown: float
+    turnover_annual: float   # one-way, fraction of portfolio value per year
+    rebalances: int
+    costs: float             # Σ transaction costs, fraction of value at the time
+
+
+class BacktestRun(BaseModel):
+    portfolio: int           # index into request.portfolios
+    schedule: str
+    equity: list[float]      # growth of 1, sampled at BacktestResponse.dates
+    drawdown: list[float]
+    stats: BacktestStats
+
+
+class BacktestResponse(BaseModel):
+    dates: list[str]
+    runs: list[BacktestRun]
+
+
+def _portfolio_matrix(portfolios: list[str | dict[str, float]]) -> np.ndarray:
+    """(B, N) target weights over UNIVERSE, each normalised to sum to 1."""
+    col = {t: i for i, t in enumerate(UNIVERSE)}
+    W = np.zeros((len(portfolios), len(UNIVERSE)))
+    for b, p in enumerate(portfolios):
+        weights = PROFILE_STUBS[p]["base_weights"] if isinstance(p, str) else p
+        for ticker, weight in weights.items():
+            i = col.get(ticker.upper())
+            if i is None:
+                raise HTTPException(status_code=400, detail=f"Unknown ticker '{ticker}' in portfolio {b}.")
+            if weight < 0:
+                raise HTTPException(status_code=400, detail=f"Negative weight for '{ticker}' in portfolio {b}.")
+            W[b, i] = weight
+        total = W[b].sum()
+        if total <= 0:
+            raise HTTPException(status_code=400, detail=f"Portfolio {b} has no positive weights.")
+        W[b] /= total
+    return W
+
+
+@app.post("/backtest", responses={200: {"model": BacktestResponse}})
+def backtest(req: BacktestRequest) -> Response:
+    """
+    Every portfolio × schedule combination over the stored price history,
+    all portfolios per schedule simulated together.
+    """
+    if len(req.portfolios) * len(req.schedules) > MAX_BACKTEST_RUNS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BACKTEST_RUNS} portfolio × schedule runs.")
+    W = _portfolio_matrix(req.portfolios)
+    matrix = _returns_for(req.range)
+    if matrix is None:
+        raise HTTPException(status_code=503, detail="Price history not loaded yet; try again shortly.")
+    # Common start: the first day every held asset has a return
+    start = int(matrix.first_row[W.any(axis=0)].max())
+    G = 1.0 + matrix.returns[start:]
+    dates = matrix.dates[start:]
+    if len(G) < 2:
+        raise HTTPException(status_code=400, detail="Not enough shared history for these portfolios.")
+
+    cost = req.cost_bps / 1e4
+    sample = np.unique(np.linspace(0, len(G) - 1, min(req.max_points, len(G))).round().astype(np.int64))
+    runs = []
+    for schedule in req.schedules:
+        if schedule.kind == "threshold":
+            res = run_threshold(G, W, np.full(len(W), schedule.band), cost)
+        else:
+            ends = np.empty(0, np.int64) if schedule.kind == "none" else period_ends(dates, schedule.kind)
+            res = run_calendar(G, W, ends, cost)
+        stats = summarize(res, len(G))
+        equity = np.ascontiguousarray(np.round(res.equity[:, sample], 5))
+        drawdown = np.ascontiguousarray(np.round(stats["drawdown"][:, sample], 5))
+        for b in range(len(W)):
+            runs.append({
+                "portfolio": b,
+                "schedule": schedule.label,
+                "equity": equity[b],
+                "drawdown": drawdown[b],
+                "stats": {
+                    "total_return": round(float(stats["total_return"][b]), 4),
+                    "cagr": round(float(stats["cagr"][b]), 4),
+                    "vol_annual": round(float(stats["vol_annual"][b]), 4),
+                    "max_drawdown": round(float(stats["max_drawdown"][b]), 4),
+                    "turnover_annual": round(float(stats["turnover_annual"][b]), 4),
+                    "rebalances": int(stats["rebalances"][b]),
+                    "costs": round(float(stats["costs"][b]), 6),
+                },
+            })
+
+    # Thousands of curves: serialize directly instead of through response models
+    with stage("serialize"):
+        body = orjson.dumps(
+            {"dates": dates[sample].astype(str).tolist(), "runs": runs},
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return Response(body, media_type="application/json")
+
+
+# ── Rolling analytics endpoints ───────────────────────────────────────────────
+
+# Prefix-sum index per range, tied to the returns matrix it was built from
+_rolling_indexes: dict[str, tuple[ReturnsMatrix, RollingIndex]] = {}
+# Encoded responses per (metric, range, window, points, tickers) until the panel changes
+_rolling_results = ResultMemo(maxsize=128)
+
+RollingRange = Literal["1y", "3y", "5y", "max"]
+
+
+class RollingResponse(BaseModel):
+    metric: str
+    range: str
+    window: int                           # trading days
+    dates: list[str]                      # window end dates
+    series: dict[str, list[float | None]]  # per ticker; null before a full listed window
+
+
+class CorrelationResponse(BaseModel):
+    range: str
+    window: int
+    tickers: list[str]
+    dates: list[str]
+    matrices: list[list[list[float | None]]]   # (dates, tickers, tickers)
+    full_range: list[list[float]]              # over the whole range, from the covariance engine
+    estimator: str
+
+
+def _rolling_index(range_key: str) -> RollingIndex:
+    matrix = _returns_for(range_key)
+    if matrix is None:
+        raise HTTPException(status_code=503, detail="Price history not loaded yet; try again shortly.")
+    held = _rolling_indexes.get(range_key)
+    if held is None or held[0] is not matrix:
+        held = _rolling_indexes[range_key] = (matrix, RollingIndex(matrix))
+    return held[1]
+
+
+def _rolling_rows(index: RollingIndex, window: int, max_points: int) -> np.ndarray:
+    rows = index.sample_rows(window, max_points)
+    if not len(rows):
+        raise HTTPException(status_code=400, detail=f"Window of {window} days is longer than the {len(index)}-day range.")
+    return rows
+
+
+def _ticker_columns(tickers: str | None) -> list[int]:
+    if not tickers:
+        return list(range(len(UNIVERSE)))
+    cols = []
+    for t in tickers.split(","):
+        t = t.strip().upper()
+        if t not in ASSET_META:
+            raise HTTPException(status_code=400, detail=f"Unknown ticker '{t}'. Use /tickers to list valid symbols.")
+        cols.append(UNIVERSE.index(t))
+    return list(dict.fromkeys(cols))
+
+
+@app.get("/rolling/correlation", responses={200: {"model": CorrelationResponse}})
+def rolling_correlation(
+    window: int = Query(63, ge=5, le=1260, description="Window length in trading days"),
+    range: RollingRange = Query("3y"),
+    max_points: int = Query(120, ge=2, le=1000, description="Window end dates sampled across the range"),
+) -> Response:
+    """N×N correlation matrices over VALID_TICKERS for a rolling window, plus the full-range matrix."""
+    def render() -> bytes:
+        index = _rolling_index(range)
+        rows = _rolling_rows(index, window, max_points)
+        with stage("stats"):
+            matrices = np.round(index.correlation(rows, window), 4)
+            full = np.round(correlation_from_covariance(_covariance(range_key=range)), 4)
+        with stage("serialize"):
+            return orjson.dumps(
+                {
+                    "range": range,
+                    "window": window,
+                    "tickers": UNIVERSE,
+                    "dates": index.m.dates[rows].astype(str).tolist(),
+                    "matrices": matrices,
+                    "full_range": full,
+                    "estimator": _COV_ESTIMATOR,
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+
+    key = ("correlation", range, window, max_points)
+    return Response(_rolling_results.get(key, (_panel.snapshot(),), render), media_type="application/json")
+
+
+@app.get("/rolling/{metric}", responses={200: {"model": RollingResponse}})
+def rolling_metric(
+    metric: Literal["volatility", "drawdown", "beta"],
+    tickers: str | None = Query(None, description="Comma-separated tickers (default: all)"),
+    window: int = Query(63, ge=5, le=1260, description="Window length in trading days"),
+    range: RollingRange = Query("3y"),
+    max_points: int = Query(500, ge=2, le=5000, description="Window end dates sampled across the range"),
+) -> Response:
+    """
+    Rolling annualised volatility, drawdown from the trailing-window high, or
+    beta to SPY, per ticker.
+    """
+    cols = _ticker_columns(tickers)
+
+    def render() -> bytes:
+        index = _rolling_index(range)
+        rows = _rolling_rows(index, window, max_points)
+        with stage("stats"):
+            values = np.round(getattr(index, metric)(rows, window), 4)
+        with stage("serialize"):
+            return orjson.dumps(
+                {
+                    "metric": metric,
+                    "range": range,
+                    "window": window,
+                    "dates": index.m.dates[rows].astype(str).tolist(),
+                    "series": {UNIVERSE[c]: np.ascontiguousarray(values[:, c]) for c in cols},
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+
+    key = (metric, range, window, max_points, tuple(cols))
+    return Response(_rolling_results.get(key, (_panel.snapshot(),), render), media_type="application/json")
 
 
 # ── Asset History schemas ─────────────────────────────────────────────────────
@@ -342,6 +1255,13 @@ class AssetStats(BaseModel):
     total_return: float
 
 
+class WindowStats(AssetStats):
+    ticker: str
+    start: str      # first bar in the window
+    end: str        # last bar in the window
+    days: int       # bars in the window
+
+
 class MarketEvent(BaseModel):
     date: str
     label: str
@@ -435,7 +1355,7 @@ GLOBAL_EVENTS: list[dict] = [
 ]
 
 
-# ── Real market data via yfinance ─────────────────────────────────────────────
+# ── Real market data (yfinance, local files or synthetic) ─────────────────────
 
 # Map internal tickers → yfinance symbols
 YF_TICKER_MAP: dict[str, str] = {
@@ -443,162 +1363,542 @@ YF_TICKER_MAP: dict[str, str] = {
     "ETH": "ETH-USD",
 }
 
-# yfinance period strings
-RANGE_MAP: dict[str, str] = {
-    "1y": "1y",
-    "3y": "3y",
-    "5y": "5y",
-    "max": "max",
+# Years of history per range key (None = full history)
+RANGE_MAP: dict[str, int | None] = {
+    "1y": 1,
+    "3y": 3,
+    "5y": 5,
+    "max": None,
 }
 
 VALID_TICKERS: list[str] = list(ASSET_META.keys())
 
-# Fresh cache: TTL 6 h — fast path for normal requests
-_history_cache: TTLCache = TTLCache(maxsize=100, ttl=6 * 3600)
-# Stale store: never expires — fallback when Yahoo is unreachable
-_stale_store: dict[tuple[str, str], tuple[list, object]] = {}
 
+def _make_provider() -> Provider:
+    if _PROVIDER == "local":
+        return LocalFileProvider(Path(_DATA_PATH), aliases={v: k for k, v in YF_TICKER_MAP.items()})
+    if _PROVIDER == "synthetic":
+        params = {
+            t: AssetParams(meta["expected_ret"], meta["vol"], seven_day=meta["asset_class"] == "crypto")
+            for t, meta in ASSET_META.items()
+        }
+        return SyntheticProvider(params, seed=_SYNTHETIC_SEED, start=_SYNTHETIC_START)
+    return YahooProvider(YF_TICKER_MAP, threads=_FETCH_CONCURRENCY)
+
+
+_provider = _make_provider()
+# Panel and shared history store per provider, so synthetic or local data
+# never mixes with (or is served as) Yahoo data
+_DATA_DIR = _CACHE_DIR if _PROVIDER == "yfinance" else _CACHE_DIR / _PROVIDER
+
+# Persistent, date-aligned close panel for the whole universe
+_panel = PricePanel(_DATA_DIR / "panel", VALID_TICKERS)
+# Minimum spacing between upstream refreshes of the panel
+_PANEL_REFRESH_INTERVAL = 15 * 60
+
+
+@dataclass(frozen=True)
+class TickerSeries:
+    """Full-resolution close history for one ticker (no-bar days removed)."""
+
+    dates: np.ndarray    # datetime64[D]
+    closes: np.ndarray   # float64
+
+    def rows(self, start: np.datetime64 | None, end: np.datetime64 | None) -> tuple[int, int]:
+        """Half-open row range [i0, i1) covering [start, end] (inclusive)."""
+        i0 = 0 if start is None else int(np.searchsorted(self.dates, start, side="left"))
+        i1 = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side="right"))
+        return i0, i1
+
+
+# L1 fresh cache: TTL 6 h — (series, fetched_at), one full series per
+# ticker, every range is a slice
+_HISTORY_TTL = 6 * 3600
+
+
+class _HistoryCache(TTLCache):
+    """TTLCache that counts expirations and capacity evictions into _history_stats."""
 
-def _fetch_real_history(ticker: str, period: str) -> tuple[list[PricePoint], AssetStats]:
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            _history_stats["l1_expired"] += len(expired)
+        return expired
+
+    def popitem(self):
+        item = super().popitem()
+        _history_stats["l1_evictions"] += 1
+        return item
+
+
+_history_cache: TTLCache = _HistoryCache(maxsize=len(VALID_TICKERS), ttl=_HISTORY_TTL)
+# L2 stale store: on disk, shared by all workers, survives restarts, LRU-bounded.
+# Source for other workers' fresh fetches, stale-while-revalidate once the TTL
+# has expired, and the fallback when Yahoo is unreachable
+_stale_store = DiskLRU(
+    _DATA_DIR / "history_l2.sqlite",
+    max_bytes=int(os.environ.get("BTC_LAB_L2_MAX_MB", "64")) * 1024 * 1024,
+)
+# Expired entries younger than this are served immediately while one
+# background refresh runs; older ones are refetched synchronously
+_SWR_MAX_AGE = 24 * 3600
+# After a failed background refresh, don't retry the same ticker for this long
+_REVALIDATE_BACKOFF = 60
+
+# One upstream fetch per ticker at a time; concurrent misses wait for it
+_history_flight: SingleFlight[TickerSeries] = SingleFlight()
+_revalidate_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="revalidate")
+_revalidate_failed_at: dict[str, float] = {}
+_history_stats: Counter[str] = Counter()
+
+
+def _download_closes(tickers: list[str], start: date | None) -> pd.DataFrame:
     """
-    Download real OHLC close prices from Yahoo Finance.
-    Uses curl_cffi session (Chrome impersonation) to bypass rate limits.
-    Raises ValueError on empty / bad data — caller handles HTTP error.
+    Daily closes for several tickers in one call to the configured provider.
+    `start=None` fetches the full history. Columns are internal tickers.
     """
-    yf_ticker = YF_TICKER_MAP.get(ticker, ticker)
-    t = yf.Ticker(yf_ticker, session=_curl_session)
-    df: pd.DataFrame = t.history(period=period, interval="1d", auto_adjust=True)
+    return _provider.download(tickers, start)
 
-    if df is None or df.empty:
-        raise ValueError(f"Yahoo Finance returned no data for '{yf_ticker}' (period={period})")
 
-    if df is None or df.empty:
-        raise ValueError(f"No data returned by Yahoo Finance for '{yf_ticker}'")
+def _fetch_real_history(ticker: str) -> TickerSeries:
+    """
+    Bring the price panel up to date from the provider (incremental, at most
+    once per _PANEL_REFRESH_INTERVAL) and return the full series for one ticker.
+    Raises on upstream failure — caller falls back to stale data.
+    """
+    _panel.refresh(_download_closes, min_interval=_PANEL_REFRESH_INTERVAL)
+    return _panel_series(ticker)
+
 
-    # Normalize columns: newer yfinance may return MultiIndex
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
+def _panel_series(ticker: str) -> TickerSeries:
+    """Full series for one ticker from the stored panel (no network)."""
+    dates, closes = _panel.snapshot().series(ticker)
+    if len(closes) < 5:
+        raise ValueError(f"Insufficient data for '{ticker}' (got {len(closes)} rows)")
+    return TickerSeries(dates, closes)
 
-    if "Close" not in df.columns:
-        raise ValueError(f"'Close' column not found for '{yf_ticker}'")
 
-    closes: pd.Series = df["Close"].ffill().dropna()
+def _encode_series(series: TickerSeries) -> bytes:
+    """Day numbers (int64) followed by closes (float64)."""
+    return series.dates.astype("datetime64[D]").view(np.int64).tobytes() + series.closes.tobytes()
 
-    if len(closes) < 5:
-        raise ValueError(f"Insufficient data for '{yf_ticker}' (got {len(closes)} rows)")
 
-    close_arr = closes.to_numpy(dtype=float)
+def _decode_series(blob: bytes) -> TickerSeries:
+    n = len(blob) // 16
+    dates = np.frombuffer(blob, dtype=np.int64, count=n).view("datetime64[D]")
+    return TickerSeries(dates, np.frombuffer(blob, dtype=np.float64, count=n, offset=n * 8))
+
+
+def _store_series(ticker: str, series: TickerSeries) -> TickerSeries:
+    fetched_at = time.time()
+    _history_cache[ticker] = (series, fetched_at)
+    _stale_store.set(ticker, _encode_series(series), stored_at=fetched_at)
+    return series
+
+
+def _stored_entry(ticker: str) -> tuple[TickerSeries, float] | None:
+    """(series, fetched_at) from the shared L2 store."""
+    hit = _stale_store.get(ticker)
+    return (_decode_series(hit[0]), hit[1]) if hit else None
+
+
+_upstream_requests = metrics.counter(
+    "btc_lab_upstream_requests_total", "Upstream history fetches per ticker", ["ticker"],
+)
+_upstream_errors = metrics.counter(
+    "btc_lab_upstream_errors_total", "Failed upstream history fetches per ticker", ["ticker"],
+)
+_upstream_in_flight = metrics.gauge("btc_lab_upstream_in_flight", "Upstream history fetches running")
+
+
+def _fetch_and_store(ticker: str) -> TickerSeries:
+    _upstream_requests.inc(ticker)
+    _upstream_in_flight.inc()
+    try:
+        return _store_series(ticker, _fetch_real_history(ticker))
+    except Exception:
+        _upstream_errors.inc(ticker)
+        raise
+    finally:
+        _upstream_in_flight.dec()
+
+
+def _revalidate(ticker: str) -> None:
+    """Refresh one ticker in the background unless a fetch is already running."""
+    if _history_flight.in_flight(ticker):
+        return
+    if time.time() - _revalidate_failed_at.get(ticker, 0.0) < _REVALIDATE_BACKOFF:
+        return
+
+    def run() -> None:
+        try:
+            _history_flight.do(ticker, lambda: _fetch_and_store(ticker))
+        except Exception as exc:
+            _revalidate_failed_at[ticker] = time.time()
+            logger.error("Background refresh failed for %s: %s", ticker, exc)
+
+    _history_stats["revalidated"] += 1
+    _revalidate_pool.submit(run)
+
+
+def _get_series(ticker: str) -> tuple[TickerSeries, bool]:
+    """
+    Full series for a ticker via in-memory L1 → shared disk L2 (fresh, or
+    stale-while-revalidate) → coalesced upstream fetch → stale fallback.
+    Returns (series, stale).
+    """
+    # ── 1. L1: in-process fresh cache ──────────────────────────────────────────
+    entry = _history_cache.get(ticker)
+    if entry is not None and time.time() - entry[1] < _HISTORY_TTL:
+        _history_stats["hits"] += 1
+        logger.info("Cache hit (fresh): %s", ticker)
+        return entry[0], False
+    _history_stats["l1_misses"] += 1
+
+    # ── 2. L2: fresh from another worker / before a restart ───────────────────
+    entry = _stored_entry(ticker)
+    if entry is not None:
+        age = time.time() - entry[1]
+        if age < _HISTORY_TTL:
+            _history_cache[ticker] = entry
+            _history_stats["l2_hits"] += 1
+            logger.info("Cache hit (shared store): %s", ticker)
+            return entry[0], False
+
+        # Expired but recent: serve it, refresh in the background
+        if age < _SWR_MAX_AGE:
+            _history_stats["stale_while_revalidate"] += 1
+            logger.info("Cache hit (expired, revalidating): %s", ticker)
+            _revalidate(ticker)
+            return entry[0], False
+
+    # ── 3. Fetch from the provider (one fetch per ticker in flight) ───────────
+    _history_stats["misses"] += 1
+    logger.info("Fetching live from %s: %s", _provider.label, ticker)
+    try:
+        series, shared = _history_flight.do(ticker, lambda: _fetch_and_store(ticker))
+        if shared:
+            _history_stats["coalesced"] += 1
+        return series, False
+
+    except Exception as exc:
+        logger.error("%s failed for %s: %s", _provider.name, ticker, exc)
+
+        # ── 4. Stale-store fallback, then the persisted panel ─────────────────
+        if entry is not None:
+            logger.warning("Serving stale data for %s", ticker)
+            _history_stats["stale_served"] += 1
+            return entry[0], True
+        try:
+            series = _panel_series(ticker)
+        except ValueError:
+            raise HTTPException(
+                status_code=502,
+                detail={
+                    "error": "upstream_failed",
+                    "message": f"{_provider.label} could not return data for '{ticker}': {exc}",
+                    "suggestion": "Retry in a few seconds, or try a different ticker/range.",
+                },
+            )
+        logger.warning("Serving stored panel data for %s", ticker)
+        _history_stats["stale_served"] += 1
+        return series, True
+
+
+# Warm-up runs this long before cache entries would expire
+_WARM_LEAD = 10 * 60
+
+
+def _warm_ticker(ticker: str) -> None:
+    """Rebuild one cache entry from the (just refreshed) panel — no network."""
+    _history_flight.do(ticker, lambda: _store_series(ticker, _panel_series(ticker)))
+
+
+_warmer = CacheWarmer(
+    VALID_TICKERS,
+    refresh=lambda: _panel.refresh(_download_closes, min_interval=_WARM_LEAD),
+    warm=_warm_ticker,
+    interval=_HISTORY_TTL - _WARM_LEAD,
+    concurrency=_FETCH_CONCURRENCY,
+)
+
+
+def _range_window(
+    series: TickerSeries, range_key: str, start: date | None, end: date | None,
+) -> tuple[np.datetime64 | None, np.datetime64 | None]:
+    """Resolve explicit dates or a RANGE_MAP key to [start, end] bounds."""
+    end_d = np.datetime64(end, "D") if end else None
+    if start:
+        return np.datetime64(start, "D"), end_d
+    years = RANGE_MAP.get(range_key, 3)
+    if years is None:
+        return None, end_d
+    anchor: date = (end_d if end_d is not None else series.dates[-1]).item()
+    try:
+        start_d = anchor.replace(year=anchor.year - years)
+    except ValueError:                      # 29 February
+        start_d = anchor.replace(year=anchor.year - years, day=28)
+    return np.datetime64(start_d, "D"), end_d
+
+
+# Window-statistics index per ticker, tied to the series it was built from
+_series_indexes: dict[str, tuple[TickerSeries, SeriesIndex]] = {}
+
+
+def _series_index(ticker: str, series: TickerSeries) -> SeriesIndex:
+    held = _series_indexes.get(ticker)
+    if held is None or held[0] is not series:
+        held = _series_indexes[ticker] = (series, SeriesIndex(series.dates, series.closes))
+    return held[1]
+
+
+def _window_stats(index: SeriesIndex, i0: int, i1: int) -> dict:
+    """AssetStats fields for rows [i0, i1) of the indexed series."""
+    return {k: round(v, 4) for k, v in index.stats(i0, i1 - 1).items()}
+
+
+def _build_history(
+    series: TickerSeries, max_points: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Down-sampled (dates, prices, drawdowns) columns for one window of a ticker's series."""
+    dates, close_arr = series.dates, series.closes
 
     # Drawdown series
     running_max = np.maximum.accumulate(close_arr)
     drawdowns = (close_arr - running_max) / running_max  # ≤ 0
 
-    # Weekly down-sample (≈52 points/year) to keep payload small
-    n = len(close_arr)
-    years_approx = max((closes.index[-1] - closes.index[0]).days / 365.25, 0.1)
-    step = max(1, n // int(years_approx * 52 + 1))
-
-    price_points: list[PricePoint] = []
-    for i in range(0, n, step):
-        price_points.append(PricePoint(
-            date=closes.index[i].date().isoformat(),
-            price=round(float(close_arr[i]), 4),
-            drawdown=round(float(drawdowns[i]), 4),
-        ))
-    # Always include the last trading day
-    if price_points[-1].date != closes.index[-1].date().isoformat():
-        price_points.append(PricePoint(
-            date=closes.index[-1].date().isoformat(),
-            price=round(float(close_arr[-1]), 4),
-            drawdown=round(float(drawdowns[-1]), 4),
-        ))
-
-    # ── Statistics ────────────────────────────────────────────────────────────
-    total_ret = (close_arr[-1] / close_arr[0]) - 1
-    cagr = (close_arr[-1] / close_arr[0]) ** (1.0 / years_approx) - 1
-
-    # Daily log-returns → annualised vol
-    log_rets = np.log(close_arr[1:] / close_arr[:-1])
-    annual_vol = float(np.std(log_rets)) * math.sqrt(252)
-
-    # Worst single calendar-month approx (every ~21 trading days)
-    monthly_simple = [
-        (close_arr[min(i + 21, n - 1)] / close_arr[i]) - 1
-        for i in range(0, n - 1, 21)
-    ]
-    worst_month = float(min(monthly_simple)) if monthly_simple else 0.0
-    max_dd = float(drawdowns.min())
-
-    stats = AssetStats(
-        cagr=round(cagr, 4),
-        vol_annual=round(annual_vol, 4),
-        max_drawdown=round(max_dd, 4),
-        worst_month=round(worst_month, 4),
-        total_return=round(total_ret, 4),
+    # Shape-preserving down-sample; default ≈52 points/year keeps payloads small.
+    # The max-drawdown trough and the peak before it are always kept.
+    years_approx = max((dates[-1] - dates[0]).astype(int) / 365.25, 0.1)
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(close_arr[: trough + 1]))
+    idx = downsample(
+        dates.astype(np.int64), close_arr,
+        max_points or int(years_approx * 52 + 1) + 1,
+        keep=np.array([peak, trough]),
     )
-
-    return price_points, stats
+    return dates[idx], np.round(close_arr[idx], 4), np.round(drawdowns[idx], 4)
 
 
 # ── History endpoint ──────────────────────────────────────────────────────────
 
-@app.get("/asset-history", response_model=AssetHistoryResponse)
+# Rendered /asset-history bodies per ticker, tied to the series object they
+# were built from: a refreshed series starts a new cache
+_RENDERED_PER_TICKER = 32
+# Bounds for the client-chosen chart resolution
+_MIN_POINTS, _MAX_POINTS = 16, 5000
+_rendered: dict[str, tuple[TickerSeries, LRUCache]] = {}
+_rendered_lock = threading.Lock()
+
+
+def _render_history(
+    ticker: str, series: TickerSeries, stale: bool,
+    range_key: str, start: date | None, end: date | None, max_points: int | None, fmt: str,
+) -> tuple[bytes, str]:
+    """Body in wire format `fmt` and its content-hash ETag."""
+    i0, i1 = series.rows(*_range_window(series, range_key, start, end))
+    if i1 - i0 < 5:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not enough data for '{ticker}' in the requested window (got {max(i1 - i0, 0)} days).",
+        )
+    window = TickerSeries(series.dates[i0:i1], series.closes[i0:i1])
+    with stage("stats"):
+        columns = _build_history(window, max_points)
+        stats = _window_stats(_series_index(ticker, series), i0, i1)
+
+    meta = ASSET_META.get(ticker, {"name": ticker, "asset_class": "other"})
+    with stage("serialize"):
+        body = wire.encode(fmt, {
+            "ticker": ticker,
+            "name": meta["name"],
+            "range_years": max(int((window.dates[-1] - window.dates[0]).astype(int) / 365.25), 1),
+            "stats": stats,
+            "events": GLOBAL_EVENTS,
+            "data_source": _provider.label + (" — stale cache" if stale else ""),
+        }, *columns)
+        return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@app.get(
+    "/asset-history",
+    responses={200: {
+        "model": AssetHistoryResponse,
+        "content": {wire.MEDIA_TYPES["columnar"]: {}, wire.MEDIA_TYPES["binary"]: {}},
+    }},
+)
 def asset_history(
     ticker: str = Query("SPY", description="Asset ticker (e.g. SPY, BTC, GLD)"),
     range: str = Query("3y", description="Time range: 1y | 3y | 5y | max"),
-) -> AssetHistoryResponse:
+    start: date | None = Query(None, description="Window start (YYYY-MM-DD); overrides range"),
+    end: date | None = Query(None, description="Window end (YYYY-MM-DD); defaults to latest bar"),
+    max_points: int | None = Query(
+        None, ge=_MIN_POINTS, le=_MAX_POINTS,
+        description="Chart resolution; defaults to ≈52 points per year",
+    ),
+    format: Literal["json", "columnar", "binary"] | None = Query(
+        None, description="Wire format; overrides the Accept header (default json)",
+    ),
+    accept: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+) -> Response:
     ticker = ticker.upper()
     if ticker not in ASSET_META:
         raise HTTPException(status_code=400, detail=f"Unknown ticker '{ticker}'. Use /tickers to list valid symbols.")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must not be after 'end'.")
+
+    fmt = wire.negotiate(format, accept)
+    series, stale = _get_series(ticker)
+
+    # Warm path: ready-to-send bytes for this exact series + query
+    key = (range, start, end, max_points, fmt, stale)
+    with _rendered_lock:
+        held = _rendered.get(ticker)
+        if held is None or held[0] is not series:
+            held = _rendered[ticker] = (series, LRUCache(maxsize=_RENDERED_PER_TICKER))
+        cached = held[1].get(key)
+    if cached is None:
+        cached = _render_history(ticker, series, stale, range, start, end, max_points, fmt)
+        with _rendered_lock:
+            held[1][key] = cached
+
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=wire.MEDIA_TYPES[fmt], headers=headers)
+
+
+@app.get("/asset-stats", response_model=WindowStats)
+def asset_stats(
+    ticker: str = Query("SPY", description="Asset ticker (e.g. SPY, BTC, GLD)"),
+    range: str = Query("3y", description="Time range: 1y | 3y | 5y | max"),
+    start: date | None = Query(None, description="Window start (YYYY-MM-DD); overrides range"),
+    end: date | None = Query(None, description="Window end (YYYY-MM-DD); defaults to latest bar"),
+) -> WindowStats:
+    """Stats for any window of the stored series in constant time (brush-to-zoom on the history chart)."""
+    ticker = ticker.upper()
+    if ticker not in ASSET_META:
+        raise HTTPException(status_code=400, detail=f"Unknown ticker '{ticker}'. Use /tickers to list valid symbols.")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must not be after 'end'.")
+    series, _ = _get_series(ticker)
+    i0, i1 = series.rows(*_range_window(series, range, start, end))
+    if i1 - i0 < 2:
+        raise HTTPException(status_code=400, detail=f"Not enough data for '{ticker}' in the requested window.")
+    with stage("stats"):
+        stats = _window_stats(_series_index(ticker, series), i0, i1)
+    with stage("model"):
+        return WindowStats(
+            ticker=ticker,
+            start=str(series.dates[i0]),
+            end=str(series.dates[i1 - 1]),
+            days=i1 - i0,
+            **stats,
+        )
 
-    period = RANGE_MAP.get(range, "3y")
-    cache_key = (ticker, period)
 
-    stale = False
+# ── History stream ────────────────────────────────────────────────────────────
 
-    # ── 1. Fresh TTL cache ─────────────────────────────────────────────────────
-    if cache_key in _history_cache:
-        price_points, stats = _history_cache[cache_key]
-        logger.info("Cache hit (fresh): %s %s", ticker, period)
+# Rows in the first chunk (early first byte) and in every later one, split
+# evenly across the requested tickers
+_STREAM_FIRST_ROWS = 256
+_STREAM_CHUNK_ROWS = 8192
+_STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
 
-    else:
-        # ── 2. Fetch from Yahoo Finance ───────────────────────────────────────
-        logger.info("Fetching live from Yahoo Finance: %s %s", ticker, period)
-        try:
-            price_points, stats = _fetch_real_history(ticker, period)
-            # Populate both caches on success
-            _history_cache[cache_key] = (price_points, stats)
-            _stale_store[cache_key] = (price_points, stats)
 
-        except Exception as exc:
-            logger.error("yfinance failed for %s %s: %s", ticker, period, exc)
-
-            # ── 3. Stale-store fallback ───────────────────────────────────────
-            if cache_key in _stale_store:
-                price_points, stats = _stale_store[cache_key]
-                stale = True
-                logger.warning("Serving stale data for %s %s", ticker, period)
-            else:
-                raise HTTPException(
-                    status_code=502,
-                    detail={
-                        "error": "upstream_failed",
-                        "message": f"Yahoo Finance could not return data for '{ticker}': {exc}",
-                        "suggestion": "Retry in a few seconds, or try a different ticker/range.",
-                    },
-                )
+def _merged_chunks(
+    windows: list[TickerSeries],
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    (dates, ticker positions, closes, drawdowns) chunks of every window merged
+    by date, tickers in request order within a date. Each chunk ends at the
+    earliest date any ticker reaches within its share of the row budget, so
+    a chunk never exceeds the budget and later chunks only hold later dates.
+    Drawdowns run from the high since the window start, carried across chunks.
+    """
+    pos = [0] * len(windows)
+    peaks = [-np.inf] * len(windows)
+    budget = max(_STREAM_FIRST_ROWS // len(windows), 1)
+    while True:
+        active = [k for k, w in enumerate(windows) if pos[k] < len(w.dates)]
+        if not active:
+            return
+        cut = min(windows[k].dates[min(pos[k] + budget, len(windows[k].dates)) - 1] for k in active)
+        parts = []
+        for k in active:
+            w = windows[k]
+            stop = int(np.searchsorted(w.dates, cut, side="right"))
+            closes = w.closes[pos[k]:stop]
+            if len(closes):
+                peak = np.maximum(np.maximum.accumulate(closes), peaks[k])
+                peaks[k] = float(peak[-1])
+                parts.append((w.dates[pos[k]:stop], np.full(len(closes), k), closes, closes / peak - 1.0))
+            pos[k] = stop
+        dates, ticks, closes, drawdowns = (np.concatenate(col) for col in zip(*parts))
+        order = np.lexsort((ticks, dates))
+        yield dates[order], ticks[order], closes[order], drawdowns[order]
+        budget = max(_STREAM_CHUNK_ROWS // len(windows), 1)
+
+
+def _encode_chunk(
+    fmt: str, names: list[str], dates: np.ndarray, ticks: np.ndarray, closes: np.ndarray, drawdowns: np.ndarray,
+) -> bytes:
+    rows = zip(
+        dates.astype(str).tolist(), [names[k] for k in ticks.tolist()],
+        np.round(closes, 4).tolist(), np.round(drawdowns, 4).tolist(),
+    )
+    if fmt == "csv":
+        return "".join(f"{d},{t},{c},{dd}\n" for d, t, c, dd in rows).encode()
+    return "".join(
+        f'{{"date":"{d}","ticker":"{t}","close":{c},"drawdown":{dd}}}\n' for d, t, c, dd in rows
+    ).encode()
 
-    meta = ASSET_META.get(ticker, {"name": ticker, "asset_class": "other"})
-    years_approx = max(len(price_points) // 52, 1)
-
-    return AssetHistoryResponse(
-        ticker=ticker,
-        name=meta["name"],
-        range_years=years_approx,
-        prices=price_points,
-        stats=stats,
-        events=GLOBAL_EVENTS,
-        data_source="Yahoo Finance (via yfinance)" + (" — stale cache" if stale else ""),
+
+@app.get("/asset-history/stream")
+def asset_history_stream(
+    tickers: str = Query("SPY", description="Comma-separated tickers; rows are interleaved by date"),
+    range: str = Query("3y", description="Time range: 1y | 3y | 5y | max"),
+    start: date | None = Query(None, description="Window start (YYYY-MM-DD); overrides range"),
+    end: date | None = Query(None, description="Window end (YYYY-MM-DD); defaults to latest bar"),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+) -> StreamingResponse:
+    """
+    Every daily bar of the window with its running drawdown, one row per
+    (date, ticker), streamed in chunks straight from the cached series.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'start' must not be after 'end'.")
+    names = [UNIVERSE[c] for c in _ticker_columns(tickers)]
+    series = [_get_series(t)[0] for t in names]
+
+    # One window for all tickers, anchored at the latest bar among them
+    lo, hi = _range_window(max(series, key=lambda s: s.dates[-1]), range, start, end)
+    windows = []
+    for s in series:
+        i0, i1 = s.rows(lo, hi)
+        windows.append(TickerSeries(s.dates[i0:i1], s.closes[i0:i1]))
+    if not any(len(w.dates) for w in windows):
+        raise HTTPException(status_code=400, detail="No data in the requested window.")
+
+    def body() -> Iterator[bytes]:
+        if format == "csv":
+            yield b"date,ticker,close,drawdown\n"
+        for chunk in _merged_chunks(windows):
+            with stage("serialize"):
+                yield _encode_chunk(format, names, *chunk)
+
+    return StreamingResponse(
+        body(), media_type=_STREAM_MEDIA_TYPES[format], headers={"Cache-Control": "no-cache"},
     )
 
 
@@ -612,3 +1912,27 @@ def list_tickers():
         }
         for t in VALID_TICKERS
     ]
+
+
+# ── Startup ───────────────────────────────────────────────────────────────────
+
+_startup: dict = {
+    "import_s": round(time.perf_counter() - _IMPORT_STARTED, 3),
+    "preload": "pending" if _PRELOAD else "disabled",
+}
+
+
+def _preload() -> None:
+    """First-use costs, off the request path: provider (yfinance / files), pandas, the covariance estimate."""
+    t0 = time.perf_counter()
+    _startup["preload"] = "running"
+    try:
+        _provider.load()
+        import pandas  # noqa: F401 – needed by the first panel refresh
+        _covariance()
+    except Exception as exc:
+        logger.warning("Startup preload failed: %s", exc)
+        _startup["preload"] = "failed"
+    else:
+        _startup["preload"] = "done"
+    _startup["preload_s"] = round(time.perf_counter() - t0, 3)
@@ -0,0 +1,77 @@
+"""
+Memo for results that are pure functions of their (quantized) inputs and of
+the market data they were computed from.
+
+Each memo is tagged with the objects its entries depend on — the panel
+snapshot, the covariance estimate — compared by identity, since those are
+replaced rather than mutated when market data is refreshed. A lookup with
+different dependencies drops every entry first.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Callable, Hashable, TypeVar
+
+from cachetools import LRUCache
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class ResultMemo:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._deps: tuple | None = None
+        self._stats: Counter[str] = Counter()
+
+    def _current(self, deps: tuple) -> bool:
+        return self._deps is not None and len(deps) == len(self._deps) \
+            and all(a is b for a, b in zip(deps, self._deps))
+
+    def _sync(self, deps: tuple) -> None:
+        if not self._current(deps):
+            if self._deps is not None:
+                self._stats["invalidations"] += 1
+            self._cache.clear()
+            self._deps = deps
+
+    def get(self, key: Hashable, deps: tuple, compute: Callable[[], T], bypass: bool = False) -> T:
+        """Cached value for `key` under `deps`, else `compute()` (stored unless `bypass`)."""
+        if bypass:
+            self._stats["bypassed"] += 1
+            return compute()
+        with self._lock:
+            self._sync(deps)
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self._stats["hits"] += 1
+                return value
+            self._stats["misses"] += 1
+        value = compute()
+        with self._lock:
+            # Not if the market data moved on while computing.
+            if self._current(deps):
+                self._cache[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._deps = None
+
+    def stats(self) -> dict:
+        hits, misses = self._stats["hits"], self._stats["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "bypassed": self._stats["bypassed"],
+            "invalidations": self._stats["invalidations"],
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+        }
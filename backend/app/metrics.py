@@ -0,0 +1,274 @@
+"""
+Prometheus-format metrics without a client library.
+
+  Counter / Gauge / Histogram   labelled series kept in plain dicts under a lock
+  collectors                    callables sampled at scrape time, for state
+                                that already has its own counters (caches,
+                                stores, memos)
+  stage(name)                   times one pipeline stage into
+                                btc_lab_stage_seconds{stage} and, when the
+                                request asked for it, into its Server-Timing
+                                header
+  MetricsMiddleware             in-flight gauge, per-route latency histogram
+                                and the optional profiling header
+
+While disabled, `stage()` returns a shared no-op context manager, metric
+updates return immediately and the middleware is not installed.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+_enabled = False
+_profiling = False
+
+# Per-request stage timings, set by the middleware for profiled requests only
+_profile: ContextVar[dict[str, float] | None] = ContextVar("btc_lab_profile", default=None)
+
+PROFILE_HEADER = "x-btc-lab-profile"
+
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def configure(enabled: bool, profiling: bool = False) -> None:
+    global _enabled, _profiling
+    _enabled = enabled
+    _profiling = enabled and profiling
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+# ── Metric types ──────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, value: float = 1.0) -> None:
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, value: float = 1.0) -> None:
+        self.inc(*labels, value=-value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}    # labels → [bucket counts…, +Inf count, sum]
+
+    def observe(self, value: float, *labels) -> None:
+        if not _enabled:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self.header()
+        for key, s in items:
+            running = 0
+            for bound, count in zip((*self.buckets, float("inf")), s[:-1]):
+                running += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(s[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {running}")
+        return lines
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+# A collector returns (name, kind, help, [(labels, value), …]) tuples
+Collector = Callable[[], Iterable[tuple[str, str, str, list[tuple[dict, float]]]]]
+
+_metrics: list[_Metric] = []
+_collectors: list[Collector] = []
+
+
+def counter(name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+    _metrics.append(m := Counter(name, help, labels))
+    return m
+
+
+def gauge(name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+    _metrics.append(m := Gauge(name, help, labels))
+    return m
+
+
+def histogram(name: str, help: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    _metrics.append(m := Histogram(name, help, labels, buckets))
+    return m
+
+
+def collector(fn: Collector) -> Collector:
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> bytes:
+    """Every metric and collector in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for m in _metrics:
+        lines += m.render()
+    for fn in _collectors:
+        for name, kind, help, samples in fn():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+# ── Stage timing ──────────────────────────────────────────────────────────────
+
+# The `stage` label's fixed value set (keeps the series count bounded)
+STAGES = frozenset({"fetch", "normalize", "stats", "model", "serialize"})
+
+stage_seconds = histogram(
+    "btc_lab_stage_seconds", "Time spent per pipeline stage", ["stage"],
+)
+
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        elapsed = time.perf_counter() - self.t0
+        stage_seconds.observe(elapsed, self.name)
+        timings = _profile.get()
+        if timings is not None:
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+
+
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """Context manager timing one stage (a shared no-op while disabled)."""
+    if name not in STAGES:
+        raise ValueError(f"unknown stage {name!r}; expected one of {', '.join(sorted(STAGES))}")
+    return _Stage(name) if _enabled else _NOOP
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+requests_in_flight = gauge("btc_lab_http_requests_in_flight", "HTTP requests being handled")
+request_seconds = histogram(
+    "btc_lab_http_request_seconds", "HTTP request latency by route template", ["method", "route", "status"],
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: in-flight gauge and latency by route template.
+    With profiling enabled, a request carrying `X-BTC-Lab-Profile: 1` gets
+    its stage timings back in a `Server-Timing` header.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = None
+        if _profiling and any(k == PROFILE_HEADER.encode() and v == b"1" for k, v in scope["headers"]):
+            timings = {}
+        token = _profile.set(timings)
+        status = [500]
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if timings is not None:
+                    total = (time.perf_counter() - t0) * 1e3
+                    value = ", ".join(
+                        [f"{k};dur={v * 1e3:.3f}" for k, v in timings.items()] + [f"app;dur={total:.3f}"]
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", value.encode())]
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            _profile.reset(token)
+            route = scope.get("route")
+            request_seconds.observe(
+                time.perf_counter() - t0,
+                scope["method"], route.path if route is not None else "unmatched", str(status[0]),
+            )
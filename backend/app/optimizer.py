@@ -0,0 +1,304 @@
+"""
+Constrained mean-variance solver used by /optimize and /frontier.
+
+Solves the long-only, fully-invested problem
+
+    min  ½·wᵀQw − cᵀw    s.t.  Σw = 1,  0 ≤ w ≤ ub
+
+with a primal active-set method. The universe is small (17 assets), so each
+iteration is one dense (|F|+1)² KKT solve; warm-starting from the previous
+solution usually converges in one to three iterations.
+
+The efficient frontier is traced parametrically with the critical-line
+algorithm: one KKT solve per turning point instead of one QP per point.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+_EPS = 1e-12
+
+
+@dataclass
+class QPResult:
+    weights: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def feasible_caps(caps: np.ndarray, per_asset_max: float) -> tuple[np.ndarray, float]:
+    """
+    Combine ticker-specific caps with the per-asset cap.
+    If the combined caps cannot sum to 1, the per-asset cap is raised to the
+    smallest value that makes the problem feasible. Returns (ub, effective_cap).
+    """
+    ub = np.minimum(caps, per_asset_max)
+    if ub.sum() >= 1.0 - 1e-9:
+        return ub, per_asset_max
+    lo, hi = per_asset_max, 1.0
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        if np.minimum(caps, mid).sum() >= 1.0:
+            hi = mid
+        else:
+            lo = mid
+    return np.minimum(caps, hi), hi
+
+
+def project_capped_simplex(v: np.ndarray, ub: np.ndarray) -> np.ndarray:
+    """Euclidean projection of v onto {w : Σw = 1, 0 ≤ w ≤ ub} (bisection on the shift)."""
+    lo, hi = float(np.min(v - ub)), float(np.max(v))
+    for _ in range(100):
+        tau = 0.5 * (lo + hi)
+        s = np.clip(v - tau, 0.0, ub).sum()
+        if abs(s - 1.0) < 1e-13:
+            break
+        if s > 1.0:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(v - tau, 0.0, ub)
+
+
+def _kkt_solve(Q: np.ndarray, free: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Solve [[Q_FF, 1], [1ᵀ, 0]] · x = rhs for one or more right-hand sides."""
+    k = len(free)
+    K = np.empty((k + 1, k + 1))
+    K[:k, :k] = Q[free[:, None], free]
+    K[:k, k] = 1.0
+    K[k, :k] = 1.0
+    K[k, k] = 0.0
+    return np.linalg.solve(K, rhs)
+
+
+def solve_qp(
+    Q: np.ndarray,
+    c: np.ndarray,
+    ub: np.ndarray,
+    w0: np.ndarray | None = None,
+    tol: float = 1e-10,
+    max_iter: int | None = None,
+) -> QPResult:
+    """
+    Primal active-set solve. `w0` (any vector, e.g. the previous solution) is
+    projected onto the feasible set and used as the starting point; its bound
+    pattern becomes the initial working set.
+    """
+    n = len(c)
+    fixed = ub <= _EPS
+    w = project_capped_simplex(w0 if w0 is not None else np.full(n, 1.0 / n), ub)
+    at_lo = (w <= _EPS) | fixed
+    at_hi = (w >= ub - _EPS) & ~at_lo
+    w[at_lo] = 0.0
+    w[at_hi] = ub[at_hi]
+    max_iter = max_iter or 10 * n + 50
+
+    for it in range(1, max_iter + 1):
+        bound = at_lo | at_hi
+        free = np.flatnonzero(~bound)
+
+        if len(free) == 0:
+            # Vertex: the multiplier of Σw = 1 can be anything in [L, U].
+            h = Q @ w - c
+            lo_idx = np.flatnonzero(at_lo & ~fixed)
+            hi_idx = np.flatnonzero(at_hi)
+            if len(lo_idx) == 0 or len(hi_idx) == 0:
+                return QPResult(w, it, True)
+            i = lo_idx[np.argmax(-h[lo_idx])]
+            j = hi_idx[np.argmin(-h[hi_idx])]
+            if -h[i] <= -h[j] + tol:
+                return QPResult(w, it, True)
+            at_lo[i] = False
+            at_hi[j] = False
+            continue
+
+        rhs = np.empty(len(free) + 1)
+        w_bound = np.where(bound, w, 0.0)
+        rhs[:-1] = c[free] - Q[free] @ w_bound
+        rhs[-1] = 1.0 - w_bound.sum()
+        sol = _kkt_solve(Q, free, rhs)
+        target, nu = sol[:-1], sol[-1]
+        p = target - w[free]
+
+        # Ratio test: step towards the equality-constrained optimum.
+        alpha, block = 1.0, -1
+        neg, pos = p < -_EPS, p > _EPS
+        if neg.any():
+            ratios = -w[free][neg] / p[neg]
+            k = int(np.argmin(ratios))
+            if ratios[k] < alpha:
+                alpha, block = ratios[k], free[neg][k]
+        if pos.any():
+            ratios = (ub[free][pos] - w[free][pos]) / p[pos]
+            k = int(np.argmin(ratios))
+            if ratios[k] < alpha:
+                alpha, block = ratios[k], free[pos][k]
+
+        w[free] += alpha * p
+        if block >= 0:
+            if p[np.searchsorted(free, block)] < 0:
+                w[block], at_lo[block] = 0.0, True
+            else:
+                w[block], at_hi[block] = ub[block], True
+            continue
+
+        # Full step: check the bound multipliers and release the worst violator.
+        g = Q @ w - c + nu
+        viol = np.zeros(n)
+        viol[at_lo & ~fixed] = -g[at_lo & ~fixed]
+        viol[at_hi] = g[at_hi]
+        k = int(np.argmax(viol))
+        if viol[k] <= tol:
+            return QPResult(w, it, True)
+        at_lo[k] = at_hi[k] = False
+
+    return QPResult(w, max_iter, False)
+
+
+def _working_set(w: np.ndarray, ub: np.ndarray, fixed: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Snap `w` onto its bounds in place; returns (at_lo, at_hi)."""
+    at_lo = (w <= 1e-10) | fixed
+    at_hi = (w >= ub - 1e-10) & ~at_lo
+    w[at_lo] = 0.0
+    w[at_hi] = ub[at_hi]
+    return at_lo, at_hi
+
+
+@dataclass
+class CriticalLine:
+    """Turning points of the efficient frontier, ordered from min-variance to max-return."""
+
+    ts: np.ndarray        # risk tolerance t at each turning point
+    weights: np.ndarray   # (k, n) portfolio at each turning point
+
+
+def critical_line(
+    cov: np.ndarray,
+    mu: np.ndarray,
+    ub: np.ndarray,
+    w_minvar: np.ndarray | None = None,
+    max_segments: int | None = None,
+) -> CriticalLine:
+    """
+    Trace the capped efficient frontier  min ½·wᵀΣw − t·μᵀw  for t ∈ [0, ∞).
+
+    Between turning points the optimal weights are linear in t, so every
+    frontier portfolio is an exact interpolation of neighbouring turning points.
+    With a (near-)singular Σ a segment's KKT solve can be too ill-conditioned
+    to land on Σw = 1; such a turning point is re-solved with `solve_qp` and
+    the trace continues from there.
+    """
+    n = len(mu)
+    fixed = ub <= _EPS
+    w = solve_qp(cov, np.zeros(n), ub, w0=w_minvar).weights
+    at_lo, at_hi = _working_set(w, ub, fixed)
+
+    t = 0.0
+    ts, ws = [0.0], [w.copy()]
+    last_toggled: set[int] = set()
+    max_segments = max_segments or 8 * n + 20
+
+    for _ in range(max_segments):
+        bound = at_lo | at_hi
+        free = np.flatnonzero(~bound)
+
+        if len(free) == 0:
+            # Vertex: leaves when some (lower, upper) pair's multiplier interval closes.
+            h0 = cov @ w
+            lo_idx = np.flatnonzero(at_lo & ~fixed)
+            hi_idx = np.flatnonzero(at_hi)
+            if len(lo_idx) == 0 or len(hi_idx) == 0:
+                break
+            dmu = mu[lo_idx][:, None] - mu[hi_idx][None, :]
+            dh = h0[lo_idx][:, None] - h0[hi_idx][None, :]
+            t_pair = np.full(dmu.shape, np.inf)
+            rising = dmu > _EPS
+            t_pair[rising] = dh[rising] / dmu[rising]
+            t_pair = np.maximum(t_pair, t)
+            k = int(np.argmin(t_pair))
+            t_next = float(t_pair.flat[k])
+            if not np.isfinite(t_next):
+                break
+            i, j = lo_idx[k // len(hi_idx)], hi_idx[k % len(hi_idx)]
+            at_lo[i] = at_hi[j] = False
+            if t_next > ts[-1] + 1e-12:
+                ts.append(t_next)
+                ws.append(w.copy())
+            t = t_next
+            last_toggled = {int(i), int(j)}
+            continue
+
+        w_bound = np.where(bound, w, 0.0)
+        rhs = np.empty((len(free) + 1, 2))
+        rhs[:-1, 0] = -cov[free] @ w_bound
+        rhs[-1, 0] = 1.0 - w_bound.sum()
+        rhs[:-1, 1] = mu[free]
+        rhs[-1, 1] = 0.0
+        sol = _kkt_solve(cov, free, rhs)
+        a, b = sol[:-1, 0], sol[:-1, 1]
+        alpha, beta = sol[-1, 0], sol[-1, 1]
+
+        wa = w_bound.copy()
+        wa[free] = a
+        wb = np.zeros(n)
+        wb[free] = b
+        g0 = cov @ wa + alpha
+        g1 = cov @ wb - mu + beta
+
+        # Next event per asset: a free weight reaches a bound, or a bound
+        # asset's multiplier changes sign.
+        events = np.full(n, np.inf)
+        down = ~bound & (wb < -_EPS)
+        up = ~bound & (wb > _EPS)
+        leave_lo = at_lo & ~fixed & (g1 < -_EPS)
+        leave_hi = at_hi & (g1 > _EPS)
+        events[down] = -wa[down] / wb[down]
+        events[up] = (ub[up] - wa[up]) / wb[up]
+        events[leave_lo] = -g0[leave_lo] / g1[leave_lo]
+        events[leave_hi] = -g0[leave_hi] / g1[leave_hi]
+        for i in last_toggled:
+            if events[i] <= t + 1e-12:
+                events[i] = np.inf
+        events = np.where(events < t - 1e-9, np.inf, np.maximum(events, t))
+
+        k = int(np.argmin(events))
+        t_next = float(events[k])
+        if not np.isfinite(t_next):
+            break
+
+        w = wa + wb * t_next
+        if not (at_lo[k] or at_hi[k]):
+            if wb[k] < 0:
+                w[k], at_lo[k] = 0.0, True
+            else:
+                w[k], at_hi[k] = ub[k], True
+        else:
+            at_lo[k] = at_hi[k] = False
+        w = np.clip(w, 0.0, ub)
+        t = t_next
+        last_toggled = {k}
+        if abs(w.sum() - 1.0) > 1e-9:
+            w = solve_qp(cov, t * mu, ub, w0=w).weights
+            at_lo, at_hi = _working_set(w, ub, fixed)
+            last_toggled = set()
+        if t_next > ts[-1] + 1e-12:
+            ts.append(t_next)
+            ws.append(w.copy())
+        else:
+            ws[-1] = w.copy()
+
+    return CriticalLine(ts=np.asarray(ts), weights=np.vstack(ws))
+
+
+def weights_at(cl: CriticalLine, t: float) -> np.ndarray:
+    """Frontier portfolio for risk tolerance t (linear between turning points)."""
+    if t <= cl.ts[0]:
+        return cl.weights[0].copy()
+    if t >= cl.ts[-1]:
+        return cl.weights[-1].copy()
+    k = int(np.searchsorted(cl.ts, t)) - 1
+    s = (t - cl.ts[k]) / (cl.ts[k + 1] - cl.ts[k])
+    return cl.weights[k] + s * (cl.weights[k + 1] - cl.weights[k])
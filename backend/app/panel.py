@@ -0,0 +1,359 @@
+"""
+Date-aligned price panel persisted as memory-mapped float64 columns.
+
+Layout under <root>/:
+    manifest.json     tickers, committed row count, capacity, current data
+                      files, last refresh time
+    dates.<gen>.i8    int64 day numbers (datetime64[D]), ascending, `capacity` long
+    closes.<gen>.f8   float64 closes, shape (n_tickers, capacity); one contiguous
+                      row per ticker, NaN where the ticker has no bar that day
+
+Readers only ever see the first `rows` columns, so appends are written in
+place beyond the committed length and published by rewriting the manifest.
+Anything that changes existing history (dividend re-adjustment, inserted
+dates, capacity growth) writes fresh files and swaps them in atomically, so
+memory maps held by readers stay valid.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+
+import numpy as np
+
+from .metrics import stage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover – non-POSIX
+    fcntl = None
+
+logger = logging.getLogger("btc-lab")
+
+# Re-fetch this many days before the last stored bar so the overlap covers at
+# least one settled close (the latest bar may have been an intraday snapshot).
+_OVERLAP_DAYS = 7
+# Relative price change on an overlapping settled bar that counts as a
+# re-adjustment (dividend / split) of the provider's back-adjusted history.
+_ADJUST_TOL = 1e-6
+
+
+@dataclass(frozen=True)
+class PanelSnapshot:
+    """Immutable, zero-copy view of the committed panel."""
+
+    tickers: tuple[str, ...]
+    dates: np.ndarray      # datetime64[D], shape (T,)
+    closes: np.ndarray     # float64, shape (N, T)
+    updated_at: float      # unix time of the last successful refresh (0 = never)
+
+    def index(self, ticker: str) -> int:
+        return self.tickers.index(ticker)
+
+    def row(self, ticker: str) -> np.ndarray:
+        """Full close history for one ticker, aligned to `dates` (view)."""
+        return self.closes[self.index(ticker)]
+
+    def window(self, start: np.datetime64 | None = None, end: np.datetime64 | None = None) -> slice:
+        """Column slice covering [start, end] (inclusive)."""
+        i0 = 0 if start is None else int(np.searchsorted(self.dates, start, side="left"))
+        i1 = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side="right"))
+        return slice(i0, i1)
+
+    def series(self, ticker: str) -> tuple[np.ndarray, np.ndarray]:
+        """(dates, closes) for one ticker with no-bar days removed."""
+        row = self.row(ticker)
+        valid = ~np.isnan(row)
+        return self.dates[valid], row[valid]
+
+    def last_valid(self, ticker: str) -> np.datetime64 | None:
+        valid = np.flatnonzero(~np.isnan(self.row(ticker)))
+        return self.dates[valid[-1]] if len(valid) else None
+
+
+class PricePanel:
+    def __init__(self, root: Path, tickers: Sequence[str]) -> None:
+        self.root = root
+        self.tickers = tuple(tickers)
+        self._read_lock = threading.Lock()      # swaps the in-memory snapshot; held briefly
+        self._write_lock = threading.RLock()    # with the flock: one writer across processes
+        self._lock_depth = 0
+        self._stamp: tuple[int, int, int] | None = None
+        self._manifest: dict = {}
+        self._snap = self._empty()
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> PanelSnapshot:
+        """
+        Current committed panel, reloaded if another thread/process changed it.
+        Never waits on a writer: manifests are replaced atomically and data
+        files of older generations stay mapped until readers move on.
+        """
+        if self._manifest_stamp() != self._stamp:
+            self._load()
+        return self._snap
+
+    def _empty(self) -> PanelSnapshot:
+        return PanelSnapshot(
+            tickers=self.tickers,
+            dates=np.empty(0, dtype="datetime64[D]"),
+            closes=np.empty((len(self.tickers), 0)),
+            updated_at=0.0,
+        )
+
+    def _manifest_stamp(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.root / "manifest.json")
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self, persist: bool = False) -> None:
+        """
+        Pick up the current manifest. A panel stored for another universe is
+        re-laid in memory; with `persist` (writers, under the file lock) it is
+        also rewritten in the configured ticker order.
+        """
+        with self._read_lock:
+            self._reload()
+            remap = persist and tuple(self._manifest.get("tickers", self.tickers)) != self.tickers
+        if remap:
+            snap = self._snap
+            self._rewrite(np.asarray(snap.dates), np.asarray(snap.closes), snap.updated_at)
+
+    def _reload(self) -> None:
+        stamp = self._manifest_stamp()
+        if stamp == self._stamp:
+            # Unchanged: keep the snapshot object, caches are tied to its identity.
+            return
+        if stamp is None:
+            self._stamp, self._manifest, self._snap = None, {}, self._empty()
+            return
+        manifest = json.loads((self.root / "manifest.json").read_text())
+        rows, cap = manifest["rows"], manifest["capacity"]
+        stored = tuple(manifest["tickers"])
+        if rows == 0:
+            dates = np.empty(0, dtype="datetime64[D]")
+            closes = np.empty((len(stored), 0))
+        else:
+            dates = np.memmap(self.root / manifest["dates_file"], dtype=np.int64, mode="r", shape=(cap,))
+            closes = np.memmap(self.root / manifest["closes_file"], dtype=np.float64, mode="r",
+                               shape=(len(stored), cap))
+            dates, closes = dates[:rows].view("datetime64[D]"), closes[:, :rows]
+
+        if stored != self.tickers:
+            # Universe changed: re-lay rows in the configured ticker order.
+            remapped = np.full((len(self.tickers), rows), np.nan)
+            for i, t in enumerate(self.tickers):
+                if t in stored:
+                    remapped[i] = closes[stored.index(t)]
+            closes = remapped
+
+        self._stamp, self._manifest = stamp, manifest
+        self._snap = PanelSnapshot(self.tickers, dates, closes, manifest.get("updated_at", 0.0))
+
+    # ── Writing ───────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """
+        Serialise writers across threads and worker processes (re-entrant).
+        Readers never take it, so they do not queue behind a refresh's download.
+        """
+        with self._write_lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / ".lock", "a") as fh:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_EX)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    if fcntl is not None:
+                        fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write_manifest(self, rows: int, capacity: int, updated_at: float,
+                        dates_file: str, closes_file: str) -> None:
+        manifest = {
+            "tickers": list(self.tickers),
+            "rows": rows,
+            "capacity": capacity,
+            "updated_at": updated_at,
+            "dates_file": dates_file,
+            "closes_file": closes_file,
+            "generation": self._manifest.get("generation", 0) + 1,
+        }
+        tmp = self.root / "manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.root / "manifest.json")
+        self._load()
+
+    def _rewrite(self, dates: np.ndarray, closes: np.ndarray, updated_at: float) -> None:
+        """Write a complete new generation of data files and publish it."""
+        rows = len(dates)
+        cap = max(1024, int(rows * 1.25) + 256)
+        gen = self._manifest.get("generation", 0) + 1
+        dates_file, closes_file = f"dates.{gen}.i8", f"closes.{gen}.f8"
+
+        d = np.memmap(self.root / dates_file, dtype=np.int64, mode="w+", shape=(cap,))
+        d[:rows] = dates.astype("datetime64[D]").astype(np.int64)
+        d.flush()
+        c = np.memmap(self.root / closes_file, dtype=np.float64, mode="w+", shape=(len(self.tickers), cap))
+        c[:] = np.nan
+        c[:, :rows] = closes
+        c.flush()
+        del d, c
+
+        old = {self._manifest.get("dates_file"), self._manifest.get("closes_file")} - {None}
+        self._write_manifest(rows, cap, updated_at, dates_file, closes_file)
+        for name in old:
+            # Readers keep their maps of the unlinked inode until they reload.
+            (self.root / name).unlink(missing_ok=True)
+
+    def merge(self, frame: pd.DataFrame, updated_at: float | None = None) -> int:
+        """
+        Merge a (date × ticker) frame of closes into the panel.
+        Returns the number of new dates appended.
+        """
+        with stage("normalize"):
+            return self._merge(frame, updated_at)
+
+    def _merge(self, frame: pd.DataFrame, updated_at: float | None) -> int:
+        frame = frame.dropna(how="all")
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        with self._file_lock():
+            self._load(persist=True)
+            snap = self._snap
+            stamp = updated_at if updated_at is not None else snap.updated_at
+            if frame.empty:
+                if updated_at is not None and snap.updated_at != updated_at:
+                    self._write_manifest(len(snap.dates), self._manifest.get("capacity", 0), stamp,
+                                         self._manifest.get("dates_file", ""),
+                                         self._manifest.get("closes_file", ""))
+                return 0
+
+            new_dates = frame.index.values.astype("datetime64[D]")
+            old_dates, old = snap.dates, snap.closes
+            rows = len(old_dates)
+            idx0 = int(np.searchsorted(old_dates, new_dates[0]))
+
+            tail_dates = np.union1d(old_dates[idx0:], new_dates)
+            tail = np.full((len(self.tickers), len(tail_dates)), np.nan)
+            tail[:, np.searchsorted(tail_dates, old_dates[idx0:])] = old[:, idx0:]
+            pos_new = np.searchsorted(tail_dates, new_dates)
+            scale = np.ones(len(self.tickers))
+
+            for ticker in frame.columns:
+                if ticker not in self.tickers:
+                    continue
+                i = self.tickers.index(ticker)
+                vals = frame[ticker].to_numpy(dtype=np.float64)
+                ok = ~np.isnan(vals)
+                # The provider back-adjusts history on dividends/splits: detect it
+                # on the earliest settled overlapping bar and rescale stored history.
+                common, i_old, i_new = np.intersect1d(old_dates, new_dates[ok], return_indices=True)
+                stored = old[i, i_old]
+                settled = ~np.isnan(stored)
+                if settled.any():
+                    k = int(np.argmax(settled))
+                    ratio = vals[ok][i_new[k]] / stored[k]
+                    if abs(ratio - 1.0) > _ADJUST_TOL:
+                        logger.info("Re-adjusting stored history for %s by %.6f", ticker, ratio)
+                        scale[i] = ratio
+                        tail[i] *= ratio
+                tail[i, pos_new[ok]] = vals[ok]
+
+            appended = len(tail_dates) - (rows - idx0)
+            cap = self._manifest.get("capacity", 0)
+            in_place = (
+                rows > 0
+                and np.all(scale == 1.0)
+                and np.array_equal(tail_dates[: rows - idx0], old_dates[idx0:])
+                and idx0 + len(tail_dates) <= cap
+            )
+            if in_place:
+                d = np.memmap(self.root / self._manifest["dates_file"], dtype=np.int64, mode="r+", shape=(cap,))
+                c = np.memmap(self.root / self._manifest["closes_file"], dtype=np.float64, mode="r+",
+                              shape=(len(self.tickers), cap))
+                d[idx0:idx0 + len(tail_dates)] = tail_dates.astype(np.int64)
+                c[:, idx0:idx0 + len(tail_dates)] = tail
+                d.flush()
+                c.flush()
+                del d, c
+                self._write_manifest(idx0 + len(tail_dates), cap, stamp,
+                                     self._manifest["dates_file"], self._manifest["closes_file"])
+            else:
+                head = np.asarray(old[:, :idx0]) * scale[:, None]
+                self._rewrite(
+                    np.concatenate([np.asarray(old_dates[:idx0]), tail_dates]),
+                    np.concatenate([head, tail], axis=1),
+                    stamp,
+                )
+            return appended
+
+    def refresh(
+        self,
+        fetch: Callable[[list[str], date | None], pd.DataFrame],
+        min_interval: float = 0.0,
+    ) -> bool:
+        """
+        Bring the panel up to date through `fetch(tickers, start)`; `start=None`
+        means full history. Tickers with stored data only request bars from
+        shortly before their last stored date: those within the overlap of the
+        newest bar share one request, a ticker lagging further gets its own, so
+        it cannot drag everyone else's start back. Returns False if the panel
+        was refreshed less than `min_interval` seconds ago (no upstream call).
+        """
+        import pandas as pd  # deferred until data actually moves
+
+        with self._file_lock():
+            self._load(persist=True)
+            snap = self._snap
+            if time.time() - snap.updated_at < min_interval:
+                return False
+
+            last = {t: snap.last_valid(t) for t in self.tickers}
+            missing = [t for t in self.tickers if last[t] is None]
+            for start, tickers in self._fetch_starts({t: d.item() for t, d in last.items() if d is not None}):
+                added = self.merge(fetch(tickers, start))
+                logger.info("Panel refresh: %d new date(s) since %s for %d tickers", added, start, len(tickers))
+            if missing:
+                added = self.merge(fetch(missing, None))
+                logger.info("Panel bootstrap: %d date(s) for %s", added, ", ".join(missing))
+            self.merge(pd.DataFrame(), updated_at=time.time())
+            return True
+
+    @staticmethod
+    def _fetch_starts(last: dict[str, date]) -> list[tuple[date, list[str]]]:
+        """(start, tickers) batches for incremental fetches, given each ticker's last stored bar."""
+        if not last:
+            return []
+        overlap = timedelta(days=_OVERLAP_DAYS)
+        newest = max(last.values())
+        current = [t for t, d in last.items() if newest - d <= overlap]
+        batches = {min(last[t] for t in current) - overlap: current}
+        for t, d in last.items():
+            if newest - d > overlap:
+                batches.setdefault(d - overlap, []).append(t)
+        return sorted(batches.items())
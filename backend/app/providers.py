@@ -0,0 +1,314 @@
+"""
+Market-data providers: where the price panel's daily closes come from.
+
+Every provider answers `download(tickers, start)` with a (date × ticker)
+frame of daily closes — internal tickers as columns, tz-naive midnight
+dates, NaN where a ticker has no bar — which is what PricePanel.refresh
+merges. `start=None` means full history.
+
+  yfinance    Yahoo Finance via one batched yf.download per call
+  local       CSV / Parquet files, all read in one pass on first use
+  synthetic   seeded geometric Brownian motion with Poisson jumps
+
+The local and synthetic providers make no network calls, so the whole
+stack runs on an air-gapped machine or under load tests. pandas, yfinance
+and curl_cffi are imported on first use, not with this module.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .metrics import stage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger("btc-lab")
+
+PROVIDERS = ("yfinance", "local", "synthetic")
+
+
+def _normalize_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Tz-naive midnight dates, ascending, one row per date (last wins)."""
+    import pandas as pd
+
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+class Provider(ABC):
+    name: str = ""
+    label: str = ""
+
+    def load(self) -> None:
+        """Do any one-off work up front (called at startup); no-op by default."""
+
+    @abstractmethod
+    def download(self, tickers: list[str], start: date | None) -> pd.DataFrame:
+        """Daily closes for `tickers` from `start` (None = full history)."""
+
+
+# ── Yahoo Finance ─────────────────────────────────────────────────────────────
+
+class YahooProvider(Provider):
+    """
+    Daily adjusted closes from Yahoo Finance, several tickers per request,
+    through a curl_cffi session impersonating Chrome (bypasses Yahoo
+    rate-limits). yfinance and the session are loaded on the first download.
+    """
+
+    name = "yfinance"
+    label = "Yahoo Finance (via yfinance)"
+
+    def __init__(self, symbols: dict[str, str], threads: int = 4) -> None:
+        self.symbols = symbols       # internal ticker → Yahoo symbol, where they differ
+        self.threads = threads
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _curl_session(self):
+        with self._lock:
+            if self._session is None:
+                from curl_cffi import requests as curl_requests
+                self._session = curl_requests.Session(impersonate="chrome")
+            return self._session
+
+    def load(self) -> None:
+        import yfinance  # noqa: F401
+
+        self._curl_session()
+
+    def download(self, tickers: list[str], start: date | None) -> pd.DataFrame:
+        import yfinance as yf
+
+        symbols = [self.symbols.get(t, t) for t in tickers]
+        span = {"start": start.isoformat()} if start else {"period": "max"}
+        with stage("fetch"):
+            df = yf.download(
+                symbols, interval="1d", auto_adjust=True, progress=False, threads=self.threads,
+                session=self._curl_session(), multi_level_index=True, **span,
+            )
+        if df is None or df.empty or "Close" not in df.columns.get_level_values(0):
+            raise ValueError(f"Yahoo Finance returned no data for {', '.join(symbols)}")
+
+        with stage("normalize"):
+            closes = df["Close"].rename(columns={self.symbols.get(t, t): t for t in tickers})
+            return _normalize_index(closes).astype(float)
+
+
+# ── Local files ───────────────────────────────────────────────────────────────
+
+_CLOSE_COLUMNS = ("adj close", "adj_close", "adjclose", "close")
+_TICKER_COLUMNS = ("ticker", "symbol")
+
+
+class LocalFileProvider(Provider):
+    """
+    Closes from CSV / Parquet files: a single file or every *.csv, *.parquet
+    under a directory, read once into one wide frame. Each file's first
+    column (or the Parquet index) is the date; layouts are told apart by
+    their columns:
+
+      wide         one column per ticker
+      long         a ticker / symbol column and a close column
+      per-ticker   a close column; the ticker is the file name (BTC.csv)
+
+    Close columns are matched case-insensitively, preferring adjusted
+    closes. Yahoo symbols (BTC-USD) are mapped back through `aliases`.
+    """
+
+    name = "local"
+
+    def __init__(self, path: Path, aliases: dict[str, str] | None = None) -> None:
+        self.path = Path(path)
+        self.aliases = aliases or {}      # file symbol → internal ticker
+        self.label = f"Local files ({self.path.name})"
+        self._frame: pd.DataFrame | None = None
+        self._lock = threading.Lock()
+
+    def _files(self) -> list[Path]:
+        if self.path.is_file():
+            return [self.path]
+        files = sorted(p for p in self.path.glob("*") if p.suffix.lower() in (".csv", ".parquet"))
+        if not files:
+            raise FileNotFoundError(f"No .csv or .parquet files under {self.path}")
+        return files
+
+    @staticmethod
+    def _read(path: Path) -> pd.DataFrame:
+        import pandas as pd
+
+        if path.suffix.lower() == ".parquet":
+            df = pd.read_parquet(path)
+            if not isinstance(df.index, pd.DatetimeIndex):
+                df = df.set_index(df.columns[0])
+            return df
+        return pd.read_csv(path, index_col=0)
+
+    def _columns(self, path: Path, df: pd.DataFrame) -> pd.DataFrame:
+        """One file's closes as a wide frame."""
+        import pandas as pd
+
+        lower = {str(c).strip().lower(): c for c in df.columns}
+        close = next((lower[c] for c in _CLOSE_COLUMNS if c in lower), None)
+        ticker = next((lower[c] for c in _TICKER_COLUMNS if c in lower), None)
+        if close is not None and ticker is not None:
+            wide = df.pivot_table(index=df.index, columns=ticker, values=close, aggfunc="last")
+        elif close is not None:
+            wide = df[[close]].rename(columns={close: path.stem})
+        else:
+            wide = df
+        wide = wide.rename(columns=lambda c: self.aliases.get(str(c), str(c).upper()))
+        return _normalize_index(wide.apply(pd.to_numeric, errors="coerce"))
+
+    def load(self) -> None:
+        import pandas as pd
+
+        with self._lock:
+            if self._frame is not None:
+                return
+            frames = [self._columns(p, self._read(p)) for p in self._files()]
+            frame = pd.concat(frames, axis=1)
+            # A ticker in several files: later files fill gaps in earlier ones
+            frame = frame.T.groupby(level=0).last().T
+            self._frame = _normalize_index(frame).astype(float)
+            logger.info(
+                "Loaded %d ticker(s) × %d date(s) from %s",
+                self._frame.shape[1], self._frame.shape[0], self.path,
+            )
+
+    def download(self, tickers: list[str], start: date | None) -> pd.DataFrame:
+        import pandas as pd
+
+        with stage("fetch"):
+            self.load()
+            frame = self._frame
+            present = [t for t in tickers if t in frame.columns]
+            if not present:
+                raise ValueError(f"No local data for {', '.join(tickers)} in {self.path}")
+            out = frame[present]
+            if start is not None:
+                out = out[out.index >= pd.Timestamp(start)]
+            return out.dropna(how="all")
+
+
+# ── Synthetic ─────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class AssetParams:
+    """Annual expected (arithmetic) return and volatility of a synthetic ticker."""
+
+    mu: float = 0.07
+    sigma: float = 0.20
+    seven_day: bool = False     # trades every calendar day (crypto)
+
+
+class SyntheticProvider(Provider):
+    """
+    Seeded GBM with compound-Poisson jumps (Merton), one independent path
+    per ticker from `start` to `end` (default today): business days, or
+    every day for seven-day assets. Tickers without `params` get
+    AssetParams().
+
+    Each ticker draws from its own streams seeded by (seed, ticker) and a
+    path is a prefix-stable function of its bar count, so later days extend
+    the same history — incremental panel refreshes stay consistent and any
+    ticker, among hundreds, can be generated alone.
+    """
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        params: dict[str, AssetParams] | None = None,
+        seed: int = 0,
+        start: date = date(2010, 1, 1),
+        end: date | None = None,      # None = today
+        jump_rate: float = 3.0,       # expected jumps per year
+        jump_mean: float = -0.03,     # mean log jump size
+        jump_vol: float = 0.06,       # std of log jump size
+        initial_price: float = 100.0,
+    ) -> None:
+        self.params = params or {}
+        self.seed = seed
+        self.start, self.end = start, end
+        self.jump_rate, self.jump_mean, self.jump_vol = jump_rate, jump_mean, jump_vol
+        self.initial_price = initial_price
+        self.label = f"Synthetic GBM + jumps (seed {seed})"
+        self._paths: dict[str, tuple[date, pd.Series]] = {}
+        self._calendars: dict[tuple[bool, date], pd.DatetimeIndex] = {}
+        self._lock = threading.Lock()
+
+    def _calendar(self, seven_day: bool, end: date) -> pd.DatetimeIndex:
+        """Every day, or Monday–Friday, from `start` through `end`."""
+        import pandas as pd
+
+        key = (seven_day, end)
+        days = self._calendars.get(key)
+        if days is None:
+            all_days = np.arange(np.datetime64(self.start, "D"), np.datetime64(end, "D") + 1)
+            days = pd.DatetimeIndex(all_days if seven_day else all_days[np.is_busday(all_days)])
+            self._calendars[key] = days
+        return days
+
+    def _path(self, ticker: str, end: date) -> pd.Series:
+        import pandas as pd
+
+        p = self.params.get(ticker, AssetParams())
+        days = self._calendar(p.seven_day, end)
+        n = len(days)
+        dt = 1.0 / (365 if p.seven_day else 252)
+
+        diffusion, counts, sizes = (
+            np.random.default_rng(s)
+            for s in np.random.SeedSequence([self.seed, zlib.crc32(ticker.encode())]).spawn(3)
+        )
+        z = diffusion.standard_normal(n)
+        k = counts.poisson(self.jump_rate * dt, n)
+        zj = sizes.standard_normal(n)
+
+        # Split the target variance between diffusion and jumps; the drift
+        # compensates both so that E[S_t] grows at `mu`
+        jump_var = self.jump_rate * (self.jump_mean ** 2 + self.jump_vol ** 2)
+        sigma = math.sqrt(max(p.sigma ** 2 - jump_var, 0.25 * p.sigma ** 2))
+        kappa = math.exp(self.jump_mean + 0.5 * self.jump_vol ** 2) - 1.0
+        drift = (math.log1p(p.mu) - 0.5 * sigma ** 2 - self.jump_rate * kappa) * dt
+
+        log_ret = drift + sigma * math.sqrt(dt) * z + k * self.jump_mean + np.sqrt(k) * self.jump_vol * zj
+        log_ret[0] = 0.0
+        return pd.Series(self.initial_price * np.exp(np.cumsum(log_ret)), index=days, name=ticker)
+
+    def _series(self, ticker: str, end: date) -> pd.Series:
+        with self._lock:
+            cached = self._paths.get(ticker)
+            if cached is not None and cached[0] == end:
+                return cached[1]
+        series = self._path(ticker, end)
+        with self._lock:
+            self._paths[ticker] = (end, series)
+        return series
+
+    def download(self, tickers: list[str], start: date | None) -> pd.DataFrame:
+        import pandas as pd
+
+        end = self.end or date.today()
+        with stage("fetch"):
+            frame = pd.concat([self._series(t, end) for t in tickers], axis=1)
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            return frame
@@ -0,0 +1,160 @@
+"""
+Historical portfolio risk from the aligned daily returns matrix.
+
+`returns_matrix` turns a panel window into a (T, N) matrix of daily simple
+returns on the benchmark's trading calendar (other assets forward-filled, so
+weekend crypto moves land on the next trading day). `portfolio_risk_batch`
+then evaluates a batch of weight vectors with one matrix product and a few
+O(T) reductions per column.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .panel import PanelSnapshot
+
+TRADING_DAYS = 252
+
+
+@dataclass(frozen=True)
+class ReturnsMatrix:
+    tickers: tuple[str, ...]
+    dates: np.ndarray        # datetime64[D], shape (T,) — return dates
+    returns: np.ndarray      # float64, shape (T, N); 0 before a ticker's first bar
+    first_row: np.ndarray    # int, shape (N,) — first row with a real return per ticker
+    benchmark: np.ndarray    # float64, shape (T,) — benchmark daily returns
+
+
+def _ffill(x: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column (leading NaNs stay)."""
+    idx = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return x[idx, np.arange(x.shape[1])]
+
+
+def returns_matrix(
+    snap: PanelSnapshot, tickers: tuple[str, ...], benchmark: str, start: np.datetime64 | None,
+) -> ReturnsMatrix:
+    """Daily returns for `tickers` over [start, latest] on `benchmark`'s calendar."""
+    cols = snap.window(start)
+    closes = np.stack([snap.row(t)[cols] for t in tickers], axis=1)
+    bench = snap.row(benchmark)[cols]
+    # Fill before dropping non-trading days so off-calendar bars carry forward.
+    trading = ~np.isnan(bench)
+    prices = _ffill(closes)[trading]
+    rets = prices[1:] / prices[:-1] - 1.0
+    listed = ~np.isnan(rets)
+    first_row = np.where(listed.any(axis=0), listed.argmax(axis=0), len(rets))
+    bench_px = bench[~np.isnan(bench)]
+    return ReturnsMatrix(
+        tickers=tickers,
+        dates=snap.dates[cols][trading].astype("datetime64[D]")[1:],
+        returns=np.nan_to_num(rets, nan=0.0),
+        first_row=first_row,
+        benchmark=bench_px[1:] / bench_px[:-1] - 1.0,
+    )
+
+
+def portfolio_risk(m: ReturnsMatrix, w: np.ndarray, rf: float) -> dict[str, float] | None:
+    """
+    Annualised vol, max drawdown, 1-day VaR/ES at 95%, Sharpe, Sortino and
+    beta to the benchmark for weights `w` (aligned with `m.tickers`).
+    Uses the rows where every held asset has data; None if fewer than 20.
+    """
+    batch = portfolio_risk_batch(m, w[None, :], rf)
+    return None if batch is None else {k: float(v[0]) for k, v in batch.items()}
+
+
+def portfolio_risk_batch(m: ReturnsMatrix, W: np.ndarray, rf: float) -> dict[str, np.ndarray] | None:
+    """
+    `portfolio_risk` for a batch of weight vectors W (B, N) at once, over the
+    rows where every asset held by any of them has data.
+    """
+    held = (W > 1e-4).any(axis=0)
+    start = int(m.first_row[held].max()) if held.any() else 0
+    R, b = m.returns[start:], m.benchmark[start:]
+    if len(R) < 20:
+        return None
+
+    r = R @ W.T                                         # (T, B)
+    n = len(r)
+    mean, vol = r.mean(axis=0), r.std(axis=0, ddof=1)
+
+    wealth = np.cumprod(1.0 + r, axis=0)
+    peaks = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+    max_dd = (wealth / peaks - 1.0).min(axis=0)
+
+    # Empirical 5% tail: VaR is the 5th-percentile return, ES the mean beyond it.
+    k = max(int(math.ceil(0.05 * n)), 1)
+    tail = np.partition(r, k - 1, axis=0)[:k]
+    var95 = tail.max(axis=0)
+    es95 = tail.mean(axis=0)
+
+    rf_daily = rf / TRADING_DAYS
+    excess = mean - rf_daily
+    downside = np.sqrt(np.mean(np.minimum(r - rf_daily, 0.0) ** 2, axis=0))
+    b_var = b.var(ddof=1)
+    beta = (b - b.mean()) @ (r - mean) / (n - 1) / b_var if b_var > 0 else np.zeros(len(W))
+
+    ann = math.sqrt(TRADING_DAYS)
+    return {
+        "vol_annual": vol * ann,
+        "max_drawdown": max_dd,
+        "var95": var95,
+        "es95": es95,
+        "sharpe": np.divide(excess * ann, vol, out=np.zeros_like(vol), where=vol > 0),
+        "sortino": np.divide(excess * ann, downside, out=np.zeros_like(downside), where=downside > 0),
+        "beta_spy": beta,
+    }
+
+
+# One-sided normal quantile and tail mean at 95 %, for the no-history fallback
+_Z95, _ES95 = 1.6448536, 2.0627128
+
+
+def euler_contributions(m: ReturnsMatrix | None, cov: np.ndarray, W: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Euler decomposition of vol, 1-day VaR95 and ES95 for a batch of weight
+    vectors W (B, N), evaluated as whole-matrix operations.
+
+    vol_i = w_i·(Σw)_i / σ_p, with Σ the sample covariance of the returns in
+    `m` over the same rows as `portfolio_risk_batch`, so the components sum
+    to its realised vol. VaR/ES come from the same rows: ES_i is the mean of
+    w_i·r_i over the 5 % tail scenarios, VaR_i its mean over a small band of
+    scenarios around the 5 % quantile (kernel-smoothed, so contributions are
+    not one day's noise). Components of each measure sum to the portfolio
+    total. Without history Σ is `cov` (annualised) and VaR/ES are Gaussian,
+    proportional to the vol components.
+    """
+    held = (np.abs(W) > 1e-4).any(axis=0)
+    start = int(m.first_row[held].max()) if m is not None and held.any() else 0
+    if m is None or len(m.returns) - start < 20:
+        S = W @ cov
+        R = None
+    else:
+        R = m.returns[start:]
+        X = R - R.mean(axis=0)
+        S = ((X @ W.T).T @ X) * (TRADING_DAYS / (len(R) - 1))     # (Σw)ᵀ per portfolio
+    vol = np.sqrt(np.maximum(np.einsum("bn,bn->b", W, S), 0.0))
+    safe = np.where(vol > 0, vol, 1.0)
+    vol_c = W * S / safe[:, None]
+
+    if R is None:
+        daily = vol_c / math.sqrt(TRADING_DAYS)
+        var_c, es_c = -_Z95 * daily, -_ES95 * daily
+    else:
+        order = np.argsort(R @ W.T, axis=0)            # (T, B) scenarios, worst first
+        k = max(int(math.ceil(0.05 * len(R))), 1)
+        h = max(1, len(R) // 250)
+        es_c = W * R[order[:k]].mean(axis=0)
+        var_c = W * R[order[max(k - 1 - h, 0):k + h]].mean(axis=0)
+
+    return {
+        "vol": vol, "vol_c": vol_c,
+        "var": var_c.sum(axis=1), "var_c": var_c,
+        "es": es_c.sum(axis=1), "es_c": es_c,
+    }
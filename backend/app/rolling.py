@@ -0,0 +1,120 @@
+"""
+Rolling-window analytics over the aligned returns matrix.
+
+`RollingIndex` keeps prefix sums over the rows of a ReturnsMatrix — Σr, Σr²,
+Σr·b against the benchmark, Σb, Σb² and (built on first use) Σr rᵀ — each
+with a leading zero row, so the moments of any window ending at row t are
+one subtraction, S[t+1] − S[t+1−w]. Statistics are evaluated only at the
+rows asked for (e.g. the chart's sample points), so a new window length
+costs O(rows·N) — O(rows·N²) for correlation matrices — with no per-window
+loop. Trailing highs for drawdowns use the van Herk / Gil-Werman block
+maximum, O(T) per series for any window.
+
+Values are NaN where the window reaches back before a ticker's first
+return.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .risk import TRADING_DAYS, ReturnsMatrix
+
+
+def _prefix(x: np.ndarray) -> np.ndarray:
+    """Cumulative sums along axis 0 with a leading zero row."""
+    out = np.zeros((len(x) + 1, *x.shape[1:]))
+    np.cumsum(x, axis=0, out=out[1:])
+    return out
+
+
+def sliding_max(x: np.ndarray, w: int) -> np.ndarray:
+    """
+    max(x[t−w+1 … t]) along axis 0 for every t (shorter windows at the
+    start): block prefix and suffix maxima, two passes over the data.
+    """
+    T = len(x)
+    w = max(1, min(w, T))
+    pad = (-T) % w
+    xp = np.concatenate([x, np.full((pad, *x.shape[1:]), -np.inf)]) if pad else x
+    blocks = xp.reshape(-1, w, *x.shape[1:])
+    head = np.maximum.accumulate(blocks, axis=1).reshape(xp.shape)               # block start … t
+    tail = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(xp.shape)  # t … block end
+    out = np.empty_like(x)
+    out[:w - 1] = head[:w - 1]
+    out[w - 1:] = np.maximum(tail[:T - w + 1], head[w - 1:T])
+    return out
+
+
+class RollingIndex:
+    def __init__(self, m: ReturnsMatrix) -> None:
+        self.m = m
+        R, b = m.returns, m.benchmark
+        self.s1 = _prefix(R)
+        self.s2 = _prefix(R * R)
+        self.rb = _prefix(R * b[:, None])
+        self.b1 = _prefix(b)
+        self.b2 = _prefix(b * b)
+        self.log_wealth = np.cumsum(np.log1p(R), axis=0)
+        self._outer: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.m.returns)
+
+    def sample_rows(self, window: int, max_points: int) -> np.ndarray:
+        """Up to `max_points` evenly spaced window-end rows, from the first full window to the last row."""
+        first, last = window - 1, len(self) - 1
+        if first > last:
+            return np.empty(0, dtype=np.int64)
+        n = min(max_points, last - first + 1)
+        return np.unique(np.linspace(first, last, n).round().astype(np.int64))
+
+    def _window(self, prefix: np.ndarray, rows: np.ndarray, window: int) -> np.ndarray:
+        return prefix[rows + 1] - prefix[rows + 1 - window]
+
+    def _unlisted(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """(rows, N) True where the window starts before the ticker's first return."""
+        return (rows - window + 1)[:, None] < self.m.first_row[None, :]
+
+    def volatility(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """Annualised sample vol of each ticker over the window ending at each row, (rows, N)."""
+        s1, s2 = self._window(self.s1, rows, window), self._window(self.s2, rows, window)
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+        return np.where(self._unlisted(rows, window), np.nan, np.sqrt(var * TRADING_DAYS))
+
+    def beta(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """Beta of each ticker to the benchmark over the window ending at each row, (rows, N)."""
+        s1, rb = self._window(self.s1, rows, window), self._window(self.rb, rows, window)
+        b1, b2 = self._window(self.b1, rows, window), self._window(self.b2, rows, window)
+        cov = rb - s1 * (b1 / window)[:, None]
+        var_b = (b2 - b1 * b1 / window)[:, None]
+        beta = np.divide(cov, var_b, out=np.full_like(cov, np.nan), where=var_b > 0)
+        return np.where(self._unlisted(rows, window), np.nan, beta)
+
+    def drawdown(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """Close at each row relative to the highest close of the trailing window, minus 1, (rows, N)."""
+        peak = sliding_max(self.log_wealth, window)[rows]
+        dd = np.expm1(self.log_wealth[rows] - peak)
+        return np.where(self._unlisted(rows, window), np.nan, dd)
+
+    def correlation(self, rows: np.ndarray, window: int) -> np.ndarray:
+        """N×N correlation matrix over the window ending at each row, (rows, N, N)."""
+        if self._outer is None:
+            R = self.m.returns
+            self._outer = _prefix(R[:, :, None] * R[:, None, :])
+        s1 = self._window(self.s1, rows, window)
+        cov = self._window(self._outer, rows, window) - s1[:, :, None] * s1[:, None, :] / window
+        sd = np.sqrt(np.maximum(np.einsum("rii->ri", cov), 0.0))
+        denom = sd[:, :, None] * sd[:, None, :]
+        corr = np.divide(cov, denom, out=np.full_like(cov, np.nan), where=denom > 0)
+        unlisted = self._unlisted(rows, window)
+        corr[unlisted[:, :, None] | unlisted[:, None, :]] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_from_covariance(cov: np.ndarray) -> np.ndarray:
+    """Correlation matrix of a covariance matrix."""
+    sd = np.sqrt(np.maximum(np.diag(cov), 0.0))
+    denom = np.outer(sd, sd)
+    return np.clip(np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0), -1.0, 1.0)
+
@@ -0,0 +1,145 @@
+"""
+Constant-time window statistics for one ticker's full close series.
+
+Built once per series:
+
+  log_close        prefix of log returns: total return / CAGR of [i, j] from
+                   two lookups
+  sq_prefix        prefix sums of squared log returns, for the window's vol
+  month tables     last bar of each calendar month, month-on-month returns
+                   and a min sparse table over them, for the worst month
+  drawdown table   disjoint sparse table over the (max, min, max drawdown)
+                   monoid: per level, aggregates from every position to the
+                   centre of its block. Max drawdown does not tolerate the
+                   overlapping halves of an ordinary sparse table, but any
+                   [i, j] straddles exactly one block centre at the level of
+                   the highest bit of i ^ j, so one merge answers it.
+
+`stats(i, j)` then costs O(1) for any inclusive row range.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+def _min_sparse_table(x: np.ndarray) -> list[np.ndarray]:
+    """table[k][i] = min(x[i : i + 2^k])."""
+    table = [x]
+    k = 1
+    while (1 << k) <= len(x):
+        prev, half = table[-1], 1 << (k - 1)
+        table.append(np.minimum(prev[:-half], prev[half:]))
+        k += 1
+    return table
+
+
+class SeriesIndex:
+    def __init__(self, dates: np.ndarray, closes: np.ndarray) -> None:
+        self.dates = dates
+        self.closes = closes
+        n = len(closes)
+        self.log_close = np.log(closes)
+        lr = np.diff(self.log_close)
+        self.sq_prefix = np.concatenate([[0.0], np.cumsum(lr * lr)])
+
+        # Calendar months: row of each month's last bar, month of every row.
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        self.month_of_row = np.concatenate([[0], np.cumsum(months[1:] != months[:-1])])
+        self.month_end = np.append(np.flatnonzero(months[1:] != months[:-1]), n - 1)
+        ends = closes[self.month_end]
+        # month_ret[m]: month m over the previous month's close (month 0 from the first bar)
+        self.month_ret = np.concatenate([[ends[0] / closes[0] - 1.0], ends[1:] / ends[:-1] - 1.0])
+        self._month_min = _min_sparse_table(self.month_ret)
+
+        self._build_drawdown_table()
+
+    # ── Drawdown table ────────────────────────────────────────────────────────
+
+    def _build_drawdown_table(self) -> None:
+        """
+        Level k splits the (padded) series into blocks of 2^k with centre c.
+        Left of c: `ext` = max and `mdd` = max drawdown of [i, c−1];
+        right of c: `ext` = min and `mdd` = max drawdown of [c, i].
+        """
+        n = len(self.closes)
+        levels = max(1, (n - 1).bit_length())
+        size = 1 << levels
+        c = np.concatenate([self.closes, np.full(size - n, self.closes[-1])])
+        self._ext = np.empty((levels + 1, size))
+        self._mdd = np.empty((levels + 1, size))
+        for k in range(1, levels + 1):
+            half = 1 << (k - 1)
+            blocks = c.reshape(-1, 2 * half)
+            left, right = blocks[:, :half], blocks[:, half:]
+
+            # Right half: running aggregates from the centre outwards.
+            run_max = np.maximum.accumulate(right, axis=1)
+            r_mdd = np.minimum.accumulate(right / run_max - 1.0, axis=1)
+            r_min = np.minimum.accumulate(right, axis=1)
+
+            # Left half, from i to the centre: mdd[i] = min(mdd[i+1], min(c[i+1:centre]) / c[i] − 1)
+            rev = left[:, ::-1]
+            after = np.minimum.accumulate(rev, axis=1)                  # min(c[i:centre]), reversed
+            after_excl = np.concatenate([np.full((len(rev), 1), np.inf), after[:, :-1]], axis=1)
+            drop = np.minimum(after_excl / rev - 1.0, 0.0)
+            l_mdd = np.minimum.accumulate(drop, axis=1)[:, ::-1]
+            l_max = np.maximum.accumulate(rev, axis=1)[:, ::-1]
+
+            self._ext[k] = np.concatenate([l_max, r_min], axis=1).ravel()
+            self._mdd[k] = np.concatenate([l_mdd, r_mdd], axis=1).ravel()
+
+    def max_drawdown(self, i: int, j: int) -> float:
+        """Largest peak-to-trough decline within rows [i, j] (≤ 0)."""
+        if i >= j:
+            return 0.0
+        k = (int(i) ^ int(j)).bit_length()
+        peak, trough = self._ext[k, i], self._ext[k, j]
+        return float(min(self._mdd[k, i], self._mdd[k, j], trough / peak - 1.0))
+
+    # ── Months ────────────────────────────────────────────────────────────────
+
+    def _min_month(self, a: int, b: int) -> float:
+        """min(month_ret[a : b + 1]); +inf if empty."""
+        if a > b:
+            return math.inf
+        k = (b - a + 1).bit_length() - 1
+        t = self._month_min[k]
+        return float(min(t[a], t[b - (1 << k) + 1]))
+
+    def worst_month(self, i: int, j: int) -> float:
+        """
+        Worst calendar-month return within rows [i, j]; the first and last
+        months count from the window's first bar / to its last bar.
+        """
+        if i >= j:
+            return 0.0
+        c = self.closes
+        m_i, m_j = int(self.month_of_row[i]), int(self.month_of_row[j])
+        if m_i == m_j:
+            return float(c[j] / c[i] - 1.0)
+        first = c[self.month_end[m_i]] / c[i] - 1.0
+        last = c[j] / c[self.month_end[m_j - 1]] - 1.0
+        return float(min(first, last, self._min_month(m_i + 1, m_j - 1)))
+
+    # ── Window statistics ─────────────────────────────────────────────────────
+
+    def stats(self, i: int, j: int) -> dict[str, float]:
+        """CAGR, annualised vol of daily log returns, max drawdown, worst month and total return over rows [i, j]."""
+        growth = math.exp(self.log_close[j] - self.log_close[i])
+        years = max(float((self.dates[j] - self.dates[i]).astype(int)) / 365.25, 0.1)
+        n = j - i
+        if n > 0:
+            mean = (self.log_close[j] - self.log_close[i]) / n
+            var = max((self.sq_prefix[j] - self.sq_prefix[i]) / n - mean * mean, 0.0)
+        else:
+            var = 0.0
+        return {
+            "cagr": growth ** (1.0 / years) - 1.0,
+            "vol_annual": math.sqrt(var) * math.sqrt(252),
+            "max_drawdown": self.max_drawdown(i, j),
+            "worst_month": self.worst_month(i, j),
+            "total_return": growth - 1.0,
+        }
@@ -0,0 +1,159 @@
+"""
+Forward simulation of a (daily rebalanced) portfolio.
+
+With fixed weights the portfolio's daily return is a scalar per day, so each
+path is one series: a stationary block bootstrap (Politis–Romano) of the
+historical portfolio returns, or draws from the portfolio marginal of a
+multivariate normal / Student-t asset model (wᵀr is again normal / t).
+
+Paths are generated in fixed-size chunks. Each chunk only leaves behind a
+log-wealth histogram per checkpoint plus a few counters, so memory does not
+grow with the path count; percentiles are read off the merged histograms.
+Every chunk draws from its own child of one SeedSequence, so results depend
+only on the seed — not on chunking order or on how many worker processes
+ran them.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+
+import numpy as np
+
+CHUNK_PATHS = 1000
+
+# Log-wealth histogram: 1e-4× … 1e4×, ≈0.2 % bin width
+_LOG_LO, _LOG_HI, _BINS = math.log(1e-4), math.log(1e4), 8192
+_BIN_W = (_LOG_HI - _LOG_LO) / _BINS
+
+
+@dataclass(frozen=True)
+class SimSpec:
+    method: str                       # bootstrap | normal | t
+    steps: int                        # trading days simulated
+    checkpoints: np.ndarray           # step indices (1-based) where wealth is recorded
+    loss_level: float                 # log-wealth threshold for the loss probabilities
+    history: np.ndarray | None = None  # bootstrap: historical portfolio daily returns
+    block: float = 20.0               # bootstrap: mean block length (days)
+    mu: float = 0.0                   # normal / t: daily mean
+    sigma: float = 0.0                # normal / t: daily stdev
+    dof: float = 5.0                  # t: degrees of freedom
+
+
+@dataclass
+class SimPartial:
+    """Mergeable summary of a set of paths."""
+
+    hist: np.ndarray          # (checkpoints, bins) int64
+    paths: int
+    terminal_sum: float
+    loss_terminal: int
+    loss_anytime: int
+
+    def absorb(self, other: SimPartial) -> None:
+        """Merge `other` into this summary in place."""
+        self.hist += other.hist
+        self.paths += other.paths
+        self.terminal_sum += other.terminal_sum
+        self.loss_terminal += other.loss_terminal
+        self.loss_anytime += other.loss_anytime
+
+
+def _log_returns(spec: SimSpec, rng: np.random.Generator, n: int) -> np.ndarray:
+    """(n, steps) daily log returns."""
+    shape = (n, spec.steps)
+    if spec.method == "bootstrap":
+        hist = np.log1p(spec.history)
+        T = len(hist)
+        new_block = rng.random(shape) < 1.0 / spec.block
+        new_block[:, 0] = True
+        starts = rng.integers(0, T, size=shape)
+        # Step index of the most recent block start, per path.
+        step = np.arange(spec.steps)
+        last = np.maximum.accumulate(np.where(new_block, step, 0), axis=1)
+        idx = (np.take_along_axis(starts, last, axis=1) + (step - last)) % T
+        return hist[idx]
+    if spec.method == "normal":
+        r = spec.mu + spec.sigma * rng.standard_normal(shape)
+    elif spec.method == "t":
+        # Unit-variance t: scale by √((ν−2)/ν).
+        scale = spec.sigma * math.sqrt((spec.dof - 2.0) / spec.dof)
+        r = spec.mu + scale * rng.standard_t(spec.dof, size=shape)
+    else:
+        raise ValueError(f"unknown method {spec.method!r}")
+    return np.log1p(np.maximum(r, -0.99))
+
+
+def run_chunk(spec: SimSpec, seed: np.random.SeedSequence, n: int) -> SimPartial:
+    """Simulate `n` paths and reduce them to a SimPartial."""
+    rng = np.random.default_rng(seed)
+    logw = np.cumsum(_log_returns(spec, rng, n), axis=1)
+    at = logw[:, spec.checkpoints - 1]                        # (n, C)
+    bins = np.clip(((at - _LOG_LO) / _BIN_W).astype(np.int64), 0, _BINS - 1)
+    flat = bins + np.arange(len(spec.checkpoints)) * _BINS
+    hist = np.bincount(flat.ravel(), minlength=len(spec.checkpoints) * _BINS).astype(np.int32)
+    terminal = logw[:, -1]
+    return SimPartial(
+        hist=hist.reshape(len(spec.checkpoints), _BINS),
+        paths=n,
+        terminal_sum=float(np.exp(terminal).sum()),
+        loss_terminal=int((terminal < spec.loss_level).sum()),
+        loss_anytime=int((logw.min(axis=1) < spec.loss_level).sum()),
+    )
+
+
+def simulate(
+    spec: SimSpec, paths: int, seed: int, pool: Executor | None = None, max_pending: int = 8,
+) -> SimPartial:
+    """
+    All chunks, in-process or fanned out over `pool` with at most
+    `max_pending` chunks outstanding; merged in chunk order.
+    """
+    sizes = [CHUNK_PATHS] * (paths // CHUNK_PATHS)
+    if paths % CHUNK_PATHS:
+        sizes.append(paths % CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    total = SimPartial(np.zeros((len(spec.checkpoints), _BINS), dtype=np.int64), 0, 0.0, 0, 0)
+    if pool is None:
+        for s, n in zip(seeds, sizes):
+            total.absorb(run_chunk(spec, s, n))
+        return total
+
+    pending: deque[Future[SimPartial]] = deque()
+    for s, n in zip(seeds, sizes):
+        pending.append(pool.submit(run_chunk, spec, s, n))
+        if len(pending) >= max_pending:
+            total.absorb(pending.popleft().result())
+    while pending:
+        total.absorb(pending.popleft().result())
+    return total
+
+
+def wealth_percentiles(hist: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """Wealth multiples at quantiles `qs` (0–1) for each histogram row, (rows, len(qs))."""
+    cdf = np.cumsum(hist, axis=1, dtype=np.float64)
+    cdf /= cdf[:, -1:]
+    out = np.empty((len(hist), len(qs)))
+    for i, row in enumerate(cdf):
+        j = np.searchsorted(row, qs, side="left")
+        prev = np.where(j > 0, row[np.maximum(j - 1, 0)], 0.0)
+        frac = np.where(row[j] > prev, (qs - prev) / np.maximum(row[j] - prev, 1e-300), 0.5)
+        out[i] = _LOG_LO + (j + frac) * _BIN_W
+    return np.exp(out)
+
+
+def terminal_histogram(hist_row: np.ndarray, bins: int = 60) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Coarse (edges, probabilities) of terminal wealth over its 0.5–99.5 %
+    range; the mass outside it is folded into the end bins.
+    """
+    lo, hi = wealth_percentiles(hist_row[None, :], np.array([0.005, 0.995]))[0]
+    edges = np.geomspace(lo, max(hi, lo * 1.001), bins + 1)
+    centres = np.exp(_LOG_LO + (np.arange(_BINS) + 0.5) * _BIN_W)
+    idx = np.clip(np.searchsorted(edges, centres, side="right") - 1, 0, bins - 1)
+    probs = np.bincount(idx, weights=hist_row, minlength=bins) / hist_row.sum()
+    return edges, probs
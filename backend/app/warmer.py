@@ -0,0 +1,110 @@
+"""
+Background cache warmer.
+
+Runs one batched upstream refresh, then rebuilds the per-ticker cache entries
+with bounded parallelism, and repeats on a fixed interval chosen to land
+shortly before the cache TTL expires. Progress is exposed via `status()`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+logger = logging.getLogger("btc-lab")
+
+
+def _iso(ts: float | None) -> str | None:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds") if ts else None
+
+
+class CacheWarmer:
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        refresh: Callable[[], object],
+        warm: Callable[[str], object],
+        interval: float,
+        concurrency: int = 4,
+        retry_interval: float = 60.0,
+    ) -> None:
+        self.tickers = list(tickers)
+        self._refresh = refresh
+        self._warm = warm
+        self.interval = interval
+        self.retry_interval = min(retry_interval, interval)
+        self.concurrency = max(1, concurrency)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._state = "idle"
+        self._ready = 0
+        self._failed: list[str] = []
+        self._runs = 0
+        self._started_at: float | None = None
+        self._completed_at: float | None = None
+        self._next_run: float | None = None
+        self._last_error: str | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            wait = self.retry_interval if self._state == "error" else self.interval
+            self._next_run = time.time() + wait
+            self._stop.wait(wait)
+
+    def run_once(self) -> None:
+        self._state, self._ready, self._failed = "warming", 0, []
+        self._started_at = time.time()
+        self._last_error = None
+        try:
+            self._refresh()
+        except Exception as exc:
+            # Leave the caches alone: requests fall back to stored data as stale.
+            self._last_error = str(exc)
+            self._state = "error"
+            logger.error("Cache warm-up refresh failed: %s", exc)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="warm") as pool:
+            futures = {pool.submit(self._warm, t): t for t in self.tickers}
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                    self._ready += 1
+                except Exception as exc:
+                    self._failed.append(futures[fut])
+                    logger.warning("Cache warm-up failed for %s: %s", futures[fut], exc)
+
+        self._runs += 1
+        self._completed_at = time.time()
+        self._state = "ready" if not self._failed else "partial"
+        logger.info(
+            "Cache warm-up done: %d/%d tickers in %.1fs",
+            self._ready, len(self.tickers), self._completed_at - self._started_at,
+        )
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "tickers_ready": self._ready,
+            "tickers_total": len(self.tickers),
+            "failed": sorted(self._failed),
+            "runs": self._runs,
+            "last_started": _iso(self._started_at),
+            "last_completed": _iso(self._completed_at),
+            "next_run": _iso(self._next_run),
+            "last_error": self._last_error,
+        }
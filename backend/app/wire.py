@@ -0,0 +1,88 @@
+"""
+Wire formats for /asset-history.
+
+  json      {"prices": [{"date", "price", "drawdown"}, ...], ...}   (default)
+  columnar  parallel arrays; dates as a start date plus day deltas
+  binary    packed little-endian arrays behind a small JSON header:
+
+              b"BLH1" | u32 header_len | header (JSON) | pad to 4
+              | i32[n] days since 1970-01-01 | f32[n] price | f32[n] drawdown
+
+The format is picked by the `format` query parameter, else by `Accept`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import orjson
+
+FORMATS = ("json", "columnar", "binary")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.btc-lab.columnar+json",
+    "binary": "application/vnd.btc-lab.history",
+}
+_ACCEPT = {**{v: k for k, v in MEDIA_TYPES.items()}, "application/octet-stream": "binary"}
+
+_MAGIC = b"BLH1"
+
+
+def negotiate(fmt: str | None, accept: str | None) -> str:
+    """Explicit `format` wins; otherwise the highest-q supported Accept type; else json."""
+    if fmt:
+        return fmt
+    best, best_q = "json", 0.0
+    for part in (accept or "").split(","):
+        media, *params = (p.strip() for p in part.split(";"))
+        found = _ACCEPT.get(media.lower())
+        if found is None:
+            continue
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = found, q
+    return best
+
+
+def encode(
+    fmt: str, doc: dict, dates: np.ndarray, prices: np.ndarray, drawdowns: np.ndarray,
+) -> bytes:
+    """Serialize one history window; `doc` holds every field except the series."""
+    if fmt == "json":
+        points = [
+            {"date": d, "price": p, "drawdown": dd}
+            for d, p, dd in zip(dates.astype(str).tolist(), prices.tolist(), drawdowns.tolist())
+        ]
+        return orjson.dumps({**doc, "prices": points})
+
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if fmt == "columnar":
+        deltas = np.diff(days, prepend=days[0])
+        return orjson.dumps({
+            **doc,
+            "start_date": str(dates[0]),
+            "date_deltas": deltas.tolist(),
+            "prices": prices.tolist(),
+            "drawdowns": drawdowns.tolist(),
+        })
+
+    if fmt == "binary":
+        header = orjson.dumps({**doc, "n": len(days)})
+        pad = -(8 + len(header)) % 4
+        return b"".join((
+            _MAGIC,
+            np.uint32(len(header)).astype("<u4").tobytes(),
+            header,
+            b"\0" * pad,
+            days.astype("<i4").tobytes(),
+            prices.astype("<f4").tobytes(),
+            drawdowns.astype("<f4").tobytes(),
+        ))
+
+    raise ValueError(f"unknown format {fmt!r}")
@@ -0,0 +1,98 @@
+"""
+Benchmark for POST /backtest: 1,000 random portfolios over the "max" range.
+
+Builds a synthetic price panel in a temp directory (no network), then times
+the vectorized engine per rebalance schedule, the full handler, and a
+per-portfolio Python day loop on a sample (extrapolated) for comparison.
+
+    cd backend && python -m bench.bench_backtest
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app import main
+from app.backtest import period_ends, run_calendar, run_threshold
+from app.panel import PricePanel
+
+
+def _synthetic_panel(years: int, seed: int) -> PricePanel:
+    """Every ticker from `years` ago (crypto trades 7 days a week) as a fresh panel."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize()
+    days = pd.date_range(end - pd.DateOffset(years=years), end, freq="D")
+    frame = {}
+    for ticker in main.VALID_TICKERS:
+        meta = main.ASSET_META[ticker]
+        idx = days if meta["asset_class"] == "crypto" else days[days.dayofweek < 5]
+        rets = rng.normal(meta["expected_ret"] / 252, meta["vol"] / np.sqrt(252), len(idx))
+        frame[ticker] = pd.Series(100.0 * np.exp(np.cumsum(rets)), index=idx)
+    panel = PricePanel(Path(tempfile.mkdtemp()) / "panel", main.VALID_TICKERS)
+    panel.merge(pd.DataFrame(frame), updated_at=time.time())
+    return panel
+
+
+def _loop_reference(G: np.ndarray, w: np.ndarray, ends: set[int], cost: float) -> np.ndarray:
+    """One portfolio, one day at a time — what the engine replaces."""
+    h, out = w.copy(), np.empty(len(G))
+    for t in range(len(G)):
+        h = h * G[t]
+        V = h.sum()
+        if t in ends:
+            traded = np.abs(w * V - h).sum()
+            V -= cost * traded
+            h = w * V
+        out[t] = V
+    return out
+
+
+def run(n: int, years: int, seed: int) -> None:
+    main._panel = _synthetic_panel(years, seed)
+    rng = np.random.default_rng(seed)
+    W = rng.dirichlet(np.full(len(main.UNIVERSE), 0.5), size=n)
+    matrix = main._returns_for("max")
+    G, dates = 1.0 + matrix.returns, matrix.dates
+    cost = 10 / 1e4
+
+    print(f"/backtest benchmark — {n} portfolios × {len(main.UNIVERSE)} assets × {len(G)} days")
+    for label, fn in [
+        ("buy & hold", lambda: run_calendar(G, W, np.empty(0, np.int64), cost)),
+        ("monthly", lambda: run_calendar(G, W, period_ends(dates, "monthly"), cost)),
+        ("quarterly", lambda: run_calendar(G, W, period_ends(dates, "quarterly"), cost)),
+        ("threshold 5%", lambda: run_threshold(G, W, np.full(n, 0.05), cost)),
+    ]:
+        t0 = time.perf_counter()
+        fn()
+        print(f"  engine, {label:<16} : {(time.perf_counter() - t0) * 1e3:8.1f} ms")
+
+    sample = min(n, 20)
+    ends = set(period_ends(dates, "monthly").tolist())
+    t0 = time.perf_counter()
+    for w in W[:sample]:
+        _loop_reference(G, w, ends, cost)
+    loop = (time.perf_counter() - t0) / sample * n
+    print(f"  python day loop, monthly : {loop * 1e3:8.1f} ms (extrapolated from {sample})")
+
+    req = main.BacktestRequest(
+        portfolios=[dict(zip(main.UNIVERSE, w.tolist())) for w in W],
+        schedules=[main.RebalanceSchedule(kind=k) for k in ("none", "monthly", "quarterly", "threshold")],
+    )
+    t0 = time.perf_counter()
+    body = main.backtest(req).body
+    print(f"  handler, 4 schedules     : {(time.perf_counter() - t0) * 1e3:8.1f} ms   {len(body) / 1e6:.1f} MB JSON")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=1000, help="number of portfolios")
+    parser.add_argument("--years", type=int, default=15, help="synthetic history length")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.n, args.years, args.seed)
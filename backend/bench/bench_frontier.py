@@ -0,0 +1,51 @@
+"""
+Latency benchmark for POST /frontier relative to POST /optimize.
+
+Replays the same slider walk as bench_optimize against both handlers and
+reports p50/p99 plus the frontier/optimize latency ratio (result memo bypassed).
+
+    cd backend && python -m bench.bench_frontier
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app import main
+from bench.harness import load_market_data, percentiles, slider_walk
+
+
+def run(n: int, seed: int) -> None:
+    inputs = load_market_data()
+    reqs = slider_walk(n, seed)
+
+    opt: list[float] = []
+    front: list[float] = []
+    segments: list[int] = []
+    for req in reqs:
+        t0 = time.perf_counter()
+        main.optimize(req, bypass_cache=True)
+        opt.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        main.frontier(req, bypass_cache=True)
+        front.append(time.perf_counter() - t0)
+
+    for req in reqs[:200]:
+        ub, _ = main._upper_bounds(req.btc_max, req.cash_max, req.per_asset_max)
+        segments.append(len(main.critical_line(main._covariance(), main.EXPECTED_RETURNS, ub).ts))
+
+    print(f"/frontier vs /optimize — {n} requests, {main.FRONTIER_POINTS} frontier points, {inputs}")
+    print(f"  /optimize : {percentiles(opt)}")
+    print(f"  /frontier : {percentiles(front)}   mean turning points {np.mean(segments):.1f}")
+    print(f"  ratio p50 : {np.percentile(front, 50) / np.percentile(opt, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=1000, help="number of requests")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.n, args.seed)
@@ -0,0 +1,130 @@
+"""
+Throughput benchmark for GET /asset-history.
+
+Seeds the in-memory history cache with synthetic series (no network) and
+replays a mix of tickers and ranges through the ASGI app, comparing:
+
+  * the previous per-request path (pydantic models + JSON encode),
+  * a cold render (build + serialize, render cache cleared each request),
+  * a warm render-cache hit, and
+  * a conditional request answered with 304 Not Modified,
+
+plus the body size of each wire format.
+
+    cd backend && python -m bench.bench_history
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app import main
+
+from bench.harness import percentiles
+
+_RANGES = ["1y", "3y", "5y", "max"]
+
+
+def _seed_cache(years: int, seed: int) -> None:
+    """Synthetic ~`years` of business-day closes for every ticker, as fresh L1 entries."""
+    rng = np.random.default_rng(seed)
+    end = np.datetime64("today", "D")
+    days = np.arange(end - np.timedelta64(int(years * 365.25), "D"), end + 1)
+    days = days[np.is_busday(days)]
+    for ticker in main.VALID_TICKERS:
+        rets = rng.normal(0.0003, 0.012, len(days))
+        closes = 100.0 * np.exp(np.cumsum(rets))
+        main._history_cache[ticker] = (main.TickerSeries(days, closes), time.time())
+
+
+def _legacy_render(ticker: str, range_key: str) -> bytes:
+    """Per-request path before the render cache: pydantic models + stdlib JSON."""
+    series, _ = main._get_series(ticker)
+    i0, i1 = series.rows(*main._range_window(series, range_key, None, None))
+    window = main.TickerSeries(series.dates[i0:i1], series.closes[i0:i1])
+    dates, prices, drawdowns = main._build_history(window)
+    stats = main._window_stats(main._series_index(ticker, series), i0, i1)
+    meta = main.ASSET_META[ticker]
+    resp = main.AssetHistoryResponse(
+        ticker=ticker,
+        name=meta["name"],
+        range_years=max(len(dates) // 52, 1),
+        prices=[
+            main.PricePoint(date=d, price=p, drawdown=dd)
+            for d, p, dd in zip(dates.astype(str).tolist(), prices.tolist(), drawdowns.tolist())
+        ],
+        stats=main.AssetStats(**stats),
+        events=[main.MarketEvent(**e) for e in main.GLOBAL_EVENTS],
+        data_source="Yahoo Finance (via yfinance)",
+    )
+    return json.dumps(jsonable_encoder(resp)).encode()
+
+
+def _timed(fn, queries) -> list[float]:
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _rate(samples: list[float]) -> str:
+    return f"{len(samples) / sum(samples):9.0f} req/s"
+
+
+def run(n: int, years: int, seed: int) -> None:
+    _seed_cache(years, seed)
+    rng = np.random.default_rng(seed)
+    queries = [
+        (main.VALID_TICKERS[rng.integers(len(main.VALID_TICKERS))], _RANGES[rng.integers(len(_RANGES))])
+        for _ in range(n)
+    ]
+    client = TestClient(main.app)
+
+    def get(q, headers=None):
+        r = client.get("/asset-history", params={"ticker": q[0], "range": q[1]}, headers=headers)
+        assert r.status_code in (200, 304), r.text
+        return r
+
+    def cold(q):
+        main._rendered.clear()
+        get(q)
+
+    etags = {q: get(q).headers["etag"] for q in set(queries)}
+
+    legacy = _timed(lambda q: _legacy_render(*q), queries)
+    cold_http = _timed(cold, queries)
+    warm_http = _timed(get, queries)
+    not_modified = _timed(lambda q: get(q, {"If-None-Match": etags[q]}), queries)
+    warm_inproc = _timed(lambda q: main.asset_history(
+        ticker=q[0], range=q[1], start=None, end=None,
+        max_points=None, format=None, accept=None, if_none_match=None,
+    ), queries)
+
+    print(f"/asset-history benchmark — {n} requests, {len(main.VALID_TICKERS)} tickers, {years}y synthetic history")
+    print(f"  legacy render (models + json) : {percentiles(legacy)}  {_rate(legacy)}")
+    print(f"  handler, render-cache hit     : {percentiles(warm_inproc)}  {_rate(warm_inproc)}")
+    print(f"  HTTP, cold render             : {percentiles(cold_http)}  {_rate(cold_http)}")
+    print(f"  HTTP, render-cache hit        : {percentiles(warm_http)}  {_rate(warm_http)}")
+    print(f"  HTTP, 304 Not Modified        : {percentiles(not_modified)}  {_rate(not_modified)}")
+
+    print("  wire size, BTC max / 600 points:")
+    for fmt in main.wire.FORMATS:
+        r = client.get("/asset-history", params={"ticker": "BTC", "range": "max", "max_points": 600, "format": fmt})
+        print(f"    {fmt:<9} {len(r.content):>8,} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=2000, help="number of requests")
+    parser.add_argument("--years", type=int, default=12, help="synthetic history length")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.n, args.years, args.seed)
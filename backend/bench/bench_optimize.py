@@ -0,0 +1,83 @@
+"""
+Latency benchmark for POST /optimize.
+
+Replays a slider drag (random walk over the UI's 0.01 slider lattice) against
+the endpoint function in-process and reports p50/p99 per request for the full
+handler (computed, and replayed through a warmed result memo) and for the
+bare solver (warm vs cold start). Market data is loaded first so it cannot
+change mid-run.
+
+    cd backend && python -m bench.bench_optimize
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app import main
+from app.optimizer import solve_qp
+from bench.harness import load_market_data, percentiles, slider_walk
+
+
+def run(n: int, seed: int) -> None:
+    inputs = load_market_data()
+    deps = main._market_inputs()
+    reqs = slider_walk(n, seed)
+
+    handler: list[float] = []
+    for req in reqs:
+        t0 = time.perf_counter()
+        main.optimize(req, bypass_cache=True)
+        handler.append(time.perf_counter() - t0)
+
+    for req in reqs:
+        main.optimize(req)
+    before = main._results.stats()
+    memoized: list[float] = []
+    for req in reqs:
+        t0 = time.perf_counter()
+        main.optimize(req)
+        memoized.append(time.perf_counter() - t0)
+    after = main._results.stats()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    invalidations = after["invalidations"] - before["invalidations"]
+
+    warm: list[float] = []
+    cold: list[float] = []
+    iters_warm: list[int] = []
+    iters_cold: list[int] = []
+    prev: dict[str, np.ndarray] = {}
+    cov = main._covariance()        # what the handler solves against
+    for req in reqs:
+        ub, _ = main._upper_bounds(req.btc_max, req.cash_max, req.per_asset_max)
+        Q = main.RISK_AVERSION[req.profile] * cov
+        t0 = time.perf_counter()
+        res = solve_qp(Q, main.EXPECTED_RETURNS, ub, w0=prev.get(req.profile))
+        warm.append(time.perf_counter() - t0)
+        iters_warm.append(res.iterations)
+        prev[req.profile] = res.weights
+        t0 = time.perf_counter()
+        res = solve_qp(Q, main.EXPECTED_RETURNS, ub)
+        cold.append(time.perf_counter() - t0)
+        iters_cold.append(res.iterations)
+
+    if any(a is not b for a, b in zip(deps, main._market_inputs())):
+        print("  warning: market data changed during the run; numbers include cache churn")
+
+    print(f"/optimize slider-drag benchmark — {n} requests, {len(main.UNIVERSE)} assets, {inputs}")
+    print(f"  handler (solve + models) : {percentiles(handler)}")
+    print(f"  handler, memo replay     : {percentiles(memoized)}   hit rate {hits / (hits + misses):.0%}"
+          f"   invalidations {invalidations}")
+    print(f"  solver, warm start       : {percentiles(warm)}   mean iters {np.mean(iters_warm):.1f}")
+    print(f"  solver, cold start       : {percentiles(cold)}   mean iters {np.mean(iters_cold):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=2000, help="number of requests")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.n, args.seed)
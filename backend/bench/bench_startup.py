@@ -0,0 +1,99 @@
+"""
+Import and startup-time budget for the API.
+
+Measures, in fresh interpreters:
+
+  * `import app.main` (median of several runs) and which heavy modules it
+    pulled in — pandas, yfinance, curl_cffi and requests_cache must not load
+    until first use,
+  * worker boot: spawning uvicorn until GET /health answers 200.
+
+Exits 1 if a budget is exceeded or a deferred module was imported.
+
+    cd backend && python -m bench.bench_startup
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+_BACKEND = Path(__file__).resolve().parent.parent
+DEFERRED = ("pandas", "yfinance", "curl_cffi", "requests_cache")
+
+_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+print(json.dumps({{"import_s": time.perf_counter() - t0, "loaded": [m for m in {DEFERRED!r} if m in sys.modules]}}))
+"""
+
+
+def _import_once() -> dict:
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=_BACKEND, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _boot_once(timeout: float) -> tuple[float, dict]:
+    """Seconds from spawning uvicorn to a 200 from /health, and the /health body."""
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=_BACKEND, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - t0, json.loads(resp.read())
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {timeout} s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(runs: int, import_budget: float, health_budget: float) -> bool:
+    imports = [_import_once() for _ in range(runs)]
+    boots = [_boot_once(timeout=30.0) for _ in range(runs)]
+
+    import_s = float(np.median([r["import_s"] for r in imports]))
+    boot_s = float(np.median([b[0] for b in boots]))
+    loaded = sorted({m for r in imports for m in r["loaded"]})
+    startup = boots[-1][1].get("startup", {})
+
+    print(f"Startup budget — median of {runs} fresh interpreters")
+    print(f"  import app.main        : {import_s * 1e3:7.0f} ms   budget {import_budget * 1e3:.0f} ms")
+    print(f"  spawn → /health 200    : {boot_s * 1e3:7.0f} ms   budget {health_budget * 1e3:.0f} ms")
+    print(f"  server-side startup    : {startup}")
+    print(f"  deferred modules loaded: {', '.join(loaded) or 'none'}")
+
+    ok = import_s <= import_budget and boot_s <= health_budget and not loaded
+    print("  within budget" if ok else "  OVER BUDGET")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=0.6, help="seconds")
+    parser.add_argument("--health-budget", type=float, default=1.5, help="seconds")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.runs, args.import_budget, args.health_budget) else 1)
@@ -0,0 +1,354 @@
+"""
+Reproducible end-to-end benchmark with machine-readable results.
+
+Yahoo is replaced by a local stand-in for `yfinance.download` that answers
+from fixture closes — seeded synthetic paths by default, or recorded data
+(`--recorded`, any layout the local provider reads) — in yfinance's own
+frame shape, so the real provider post-processing, panel merge and cache
+layers all run. The panel and shared history store live in a temporary
+directory. Measured:
+
+  fetch.bootstrap / fetch.incremental   _fetch_real_history on an empty /
+                                        populated panel (upstream stand-in
+                                        time reported separately)
+  asset_history.cold / .warm            GET /asset-history with every cache
+                                        layer emptied / fully warm
+  optimize / frontier                   slider walk, result memo bypassed,
+                                        plus optimize through the memo
+  concurrent.*                          the same requests through the ASGI
+                                        app with N concurrent clients
+
+Results go to stdout (or `-o FILE`) as JSON with the commit and versions;
+`--compare OLD NEW` reports p50 changes and exits 1 on regressions.
+
+    cd backend && python -m bench.harness -o bench/results/$(git rev-parse --short HEAD).json
+    cd backend && python -m bench.harness --compare bench/results/abc1234.json bench/results/def5678.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from app import main
+from app.diskcache import DiskLRU
+from app.panel import PricePanel
+from app.providers import AssetParams, LocalFileProvider, SyntheticProvider, YahooProvider
+
+SCHEMA = 1
+_RANGES = ["1y", "3y", "5y", "max"]
+
+
+# ── Upstream stand-in ─────────────────────────────────────────────────────────
+
+class YahooStandIn:
+    """
+    Drop-in for `yfinance.download`: fixture closes (internal tickers as
+    columns) returned as yfinance's (field, symbol) column frame.
+    """
+
+    def __init__(self, closes: pd.DataFrame, symbols: dict[str, str]) -> None:
+        closes = closes.rename(columns=lambda t: symbols.get(t, t))
+        fields = {"Close": closes, "High": closes * 1.01, "Low": closes * 0.99, "Open": closes, "Volume": closes * 0}
+        self.frame = pd.concat(fields, axis=1, names=["Price", "Ticker"])
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, symbols: list[str], start: str | None = None, **_) -> pd.DataFrame:
+        t0 = time.perf_counter()
+        df = self.frame.loc[:, (slice(None), symbols)]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        df = df.dropna(how="all")
+        self.calls += 1
+        self.seconds += time.perf_counter() - t0
+        return df
+
+
+def _fixture(args) -> tuple[pd.DataFrame, dict]:
+    if args.recorded:
+        closes = LocalFileProvider(args.recorded, aliases={v: k for k, v in main.YF_TICKER_MAP.items()}) \
+            .download(main.VALID_TICKERS, None)
+        source = {"source": "recorded", "path": str(args.recorded)}
+    else:
+        params = {
+            t: AssetParams(meta["expected_ret"], meta["vol"], seven_day=meta["asset_class"] == "crypto")
+            for t, meta in main.ASSET_META.items()
+        }
+        end = date.fromisoformat(args.end)
+        provider = SyntheticProvider(params, seed=args.seed, start=date(end.year - args.years, 1, 1), end=end)
+        closes = provider.download(main.VALID_TICKERS, None)
+        source = {"source": "synthetic", "seed": args.seed, "years": args.years, "end": args.end}
+    return closes, {**source, "tickers": closes.shape[1], "dates": closes.shape[0]}
+
+
+# ── Shared helpers ────────────────────────────────────────────────────────────
+
+def slider_walk(n: int, seed: int) -> list[main.OptimizeRequest]:
+    """A slider drag: random walk over the UI's 0.01 cap lattice, occasionally switching profile."""
+    rng = np.random.default_rng(seed)
+    btc, cash, per_asset = 15, 20, 35            # in slider steps of 0.01
+    profiles = list(main.RISK_AVERSION)
+    profile = "balanced"
+    reqs = []
+    for _ in range(n):
+        knob = rng.integers(4)
+        step = int(rng.choice([-1, 1]))
+        if knob == 0:
+            btc = int(np.clip(btc + step, 0, 30))
+        elif knob == 1:
+            cash = int(np.clip(cash + step, 0, 30))
+        elif knob == 2:
+            per_asset = int(np.clip(per_asset + step, 5, 40))
+        elif rng.random() < 0.05:
+            profile = profiles[rng.integers(len(profiles))]
+        reqs.append(main.OptimizeRequest(
+            profile=profile, btc_max=btc / 100, cash_max=cash / 100, per_asset_max=per_asset / 100,
+        ))
+    return reqs
+
+
+def load_market_data() -> str:
+    """
+    Bring the price panel up to date before timing, so a background refresh
+    cannot land mid-run and swap `_market_inputs()` (which would invalidate
+    the result memo and change the covariance being solved). If the provider
+    has no data, the covariance is pinned to the model and background
+    refreshes are switched off. Returns a description of the inputs in use.
+    """
+    try:
+        main._fetch_real_history(main.RISK_BENCHMARK)
+    except Exception as exc:
+        print(f"  (price history unavailable from {main._provider.label}: {exc})", file=sys.stderr)
+    if main._returns_for(main._COV_RANGE) is None:
+        main._COV_ESTIMATOR = "model"
+        main._revalidate = lambda ticker: None
+        return "model covariance (no price history)"
+    return f"{main._COV_ESTIMATOR} covariance over {main._COV_RANGE}, {main._provider.label}"
+
+
+def percentiles(samples: list[float]) -> str:
+    """One-line p50 / p99 / max in milliseconds."""
+    ms = np.asarray(samples) * 1e3
+    return f"p50 {np.percentile(ms, 50):7.3f} ms   p99 {np.percentile(ms, 99):7.3f} ms   max {ms.max():7.3f} ms"
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def _summary(samples: list[float], wall: float | None = None) -> dict:
+    ms = np.asarray(samples) * 1e3
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p90_ms": round(float(np.percentile(ms, 90)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "throughput_rps": round(len(ms) / (wall if wall is not None else ms.sum() / 1e3), 1),
+    }
+
+
+def _timed(fn, items, setup=None) -> list[float]:
+    samples = []
+    for item in items:
+        if setup is not None:
+            setup(item)
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+class _Env:
+    """Fresh panel / stores under one temporary directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.count = 0
+
+    def _path(self, name: str) -> Path:
+        self.count += 1
+        return self.root / f"{name}-{self.count}"
+
+    def empty_panel(self) -> None:
+        main._panel = PricePanel(self._path("panel"), main.VALID_TICKERS)
+
+    def empty_caches(self) -> None:
+        main._history_cache.clear()
+        main._rendered.clear()
+        main._series_indexes.clear()
+        main._stale_store = DiskLRU(self._path("l2.sqlite"), max_bytes=64 * 1024 * 1024)
+
+
+def _asset_history(q) -> None:
+    resp = main.asset_history(
+        ticker=q[0], range=q[1], start=None, end=None,
+        max_points=None, format=None, accept=None, if_none_match=None,
+    )
+    assert resp.status_code == 200
+
+
+async def _concurrent(paths: list[tuple[str, str, dict]], clients: int) -> tuple[list[float], float]:
+    """Issue (method, url, body/params) requests from `clients` concurrent clients through the ASGI app."""
+    transport = httpx.ASGITransport(app=main.app)
+    samples: list[float] = []
+    queue = iter(paths)
+
+    async def client(http: httpx.AsyncClient) -> None:
+        for method, url, payload in queue:
+            t0 = time.perf_counter()
+            if method == "GET":
+                r = await http.get(url, params=payload)
+            else:
+                r = await http.post(url, json=payload)
+            samples.append(time.perf_counter() - t0)
+            assert r.status_code == 200, r.text
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        wall = time.perf_counter() - t0
+    return samples, wall
+
+
+def run(args) -> dict:
+    closes, fixture = _fixture(args)
+    stand_in = YahooStandIn(closes, main.YF_TICKER_MAP)
+    real_download = yf.download
+    yf.download = stand_in
+    main._provider = YahooProvider(main.YF_TICKER_MAP, threads=main._FETCH_CONCURRENCY)
+    refresh_interval = main._PANEL_REFRESH_INTERVAL
+    results: dict[str, dict] = {}
+
+    def upstream(label: str, fn, items, setup=None) -> None:
+        calls, seconds = stand_in.calls, stand_in.seconds
+        results[label] = _summary(_timed(fn, items, setup))
+        results[label]["upstream_calls"] = stand_in.calls - calls
+        results[label]["upstream_ms_mean"] = round((stand_in.seconds - seconds) * 1e3 / len(items), 4)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="btc-lab-bench-") as tmp:
+            env = _Env(Path(tmp))
+            rng = np.random.default_rng(args.seed)
+            tickers = [main.VALID_TICKERS[i] for i in rng.integers(len(main.VALID_TICKERS), size=args.n)]
+            queries = [(t, _RANGES[i]) for t, i in zip(tickers, rng.integers(len(_RANGES), size=args.n))]
+
+            # ── _fetch_real_history: download + normalize + panel merge + series
+            main._PANEL_REFRESH_INTERVAL = 0
+            upstream("fetch.bootstrap", main._fetch_real_history, tickers[:args.cold], setup=lambda _: env.empty_panel())
+            upstream("fetch.incremental", main._fetch_real_history, tickers[:args.n // 4])
+
+            # ── /asset-history: every cache layer empty (one incremental upstream call) vs warm
+            upstream("asset_history.cold", _asset_history, queries[:args.cold], setup=lambda _: env.empty_caches())
+            main._PANEL_REFRESH_INTERVAL = refresh_interval
+            for q in set(queries):
+                _asset_history(q)
+            results["asset_history.warm"] = _summary(_timed(_asset_history, queries))
+
+            # ── /optimize, /frontier on the fixture covariance
+            reqs = slider_walk(args.n, args.seed)
+            results["optimize"] = _summary(_timed(lambda r: main.optimize(r, bypass_cache=True), reqs))
+            results["optimize.memo"] = _summary(_timed(main.optimize, reqs))
+            results["frontier"] = _summary(_timed(lambda r: main.frontier(r, bypass_cache=True), reqs))
+
+            # ── Concurrent clients through the ASGI app (threadpool for sync handlers)
+            bodies = [r.model_dump() for r in reqs]
+            scenarios = {
+                "concurrent.asset_history": [("GET", "/asset-history", {"ticker": t, "range": r}) for t, r in queries],
+                "concurrent.optimize": [("POST", "/optimize?bypass_cache=true", b) for b in bodies],
+                "concurrent.frontier": [("POST", "/frontier?bypass_cache=true", b) for b in bodies],
+            }
+            for label, paths in scenarios.items():
+                samples, wall = asyncio.run(_concurrent(paths, args.clients))
+                results[label] = {**_summary(samples, wall), "clients": args.clients}
+    finally:
+        yf.download = real_download
+        main._PANEL_REFRESH_INTERVAL = refresh_interval
+
+    return {
+        "schema": SCHEMA,
+        "meta": {**_revision(), **_versions(), "fixture": fixture,
+                 "params": {"n": args.n, "cold": args.cold, "clients": args.clients, "seed": args.seed}},
+        "results": results,
+    }
+
+
+def _revision() -> dict:
+    def git(*cmd: str) -> str:
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def _versions() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+# ── Comparison ────────────────────────────────────────────────────────────────
+
+def compare(old: dict, new: dict, tolerance: float) -> list[str]:
+    """Print p50 / throughput changes per benchmark; returns the names that got slower than `tolerance`."""
+    print(f"{'benchmark':<28}{'p50 old':>11}{'p50 new':>11}{'change':>9}{'rps old':>11}{'rps new':>11}")
+    regressions = []
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if a is None or b is None:
+            print(f"{name:<28}{'(only in ' + ('new' if a is None else 'old') + ')':>22}")
+            continue
+        change = b["p50_ms"] / a["p50_ms"] - 1.0 if a["p50_ms"] else 0.0
+        flag = "  <- regression" if change > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28}{a['p50_ms']:>9.3f}ms{b['p50_ms']:>9.3f}ms{change:>+9.1%}"
+              f"{a['throughput_rps']:>11.0f}{b['throughput_rps']:>11.0f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=1000, help="requests per warm / in-process benchmark")
+    parser.add_argument("--cold", type=int, default=30, help="requests per cold benchmark")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent ASGI clients")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--years", type=int, default=15, help="synthetic fixture history length")
+    parser.add_argument("--end", default="2024-12-31", help="synthetic fixture last day")
+    parser.add_argument("--recorded", type=Path, help="recorded closes (CSV / Parquet file or directory) instead of synthetic")
+    parser.add_argument("-o", "--output", type=Path, help="write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="p50 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (json.loads(p.read_text()) for p in args.compare)
+        sys.exit(1 if compare(old, new, args.tolerance) else 0)
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,5 @@
+import os
+
+# Offline, no background threads: app.main reads these at import
+os.environ.setdefault("BTC_LAB_PROVIDER", "synthetic")
+os.environ.setdefault("BTC_LAB_PRELOAD", "0")
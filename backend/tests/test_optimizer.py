@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from app.optimizer import critical_line, feasible_caps, solve_qp, weights_at
+
+
+def _singular_case(seed: int, n: int = 17):
+    """Rank-deficient Σ (fewer factors than assets) with the 1e-10 ridge."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0.0, 0.1, (n, int(rng.integers(2, n))))
+    cov = factors @ factors.T + 1e-10 * np.eye(n)
+    mu = rng.normal(0.07, 0.05, n)
+    ub, _ = feasible_caps(rng.uniform(0.05, 1.0, n), float(rng.uniform(0.1, 0.6)))
+    return cov, mu, ub
+
+
+# Seeds whose first segments hit near-singular KKT systems
+@pytest.mark.parametrize("seed", [384, 394, 459, 929, 1536, 2597])
+def test_critical_line_with_singular_covariance(seed):
+    cov, mu, ub = _singular_case(seed)
+    cl = critical_line(cov, mu, ub)
+
+    def objective(w, t):
+        return 0.5 * w @ cov @ w - t * mu @ w
+
+    ts = cl.ts[np.isfinite(cl.ts)]
+    probes = np.concatenate([ts, 0.5 * (ts[:-1] + ts[1:])])
+    for t in probes:
+        w = weights_at(cl, t)
+        assert w.sum() == pytest.approx(1.0, abs=1e-9)
+        assert np.all(w >= -1e-12) and np.all(w <= ub + 1e-12)
+        best = solve_qp(cov, t * mu, ub).weights
+        assert objective(w, t) <= objective(best, t) + 1e-9
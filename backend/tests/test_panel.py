@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.panel import PricePanel
+
+
+def _closes(tickers, start, end):
+    index = pd.bdate_range(start, end)
+    return pd.DataFrame({t: np.linspace(100.0, 110.0, len(index)) for t in tickers}, index=index)
+
+
+def test_snapshot_does_not_wait_on_refresh(tmp_path):
+    panel = PricePanel(tmp_path, ["A", "B"])
+    panel.merge(_closes(["A", "B"], "2024-01-01", "2024-03-01"), updated_at=1.0)
+    fetching, release = threading.Event(), threading.Event()
+
+    def slow_fetch(tickers, start):
+        fetching.set()
+        release.wait(5)
+        return _closes(tickers, "2024-02-20", "2024-03-08")
+
+    writer = threading.Thread(target=panel.refresh, args=(slow_fetch,))
+    writer.start()
+    assert fetching.wait(5)
+    # Manifest stamp changes (as if another worker published) mid-download
+    (tmp_path / "manifest.json").touch()
+    t0 = time.perf_counter()
+    snap = panel.snapshot()
+    elapsed = time.perf_counter() - t0
+    release.set()
+    writer.join()
+    assert elapsed < 1.0
+    assert snap.dates[-1] == np.datetime64("2024-03-01")
+    assert panel.snapshot().dates[-1] == np.datetime64("2024-03-08")
+
+
+def test_lagging_ticker_gets_its_own_fetch_start():
+    today = date(2024, 3, 8)
+    starts = PricePanel._fetch_starts({"A": today, "B": today - timedelta(days=1), "STALE": date(2023, 1, 2)})
+    assert starts == [
+        (date(2022, 12, 26), ["STALE"]),
+        (today - timedelta(days=8), ["A", "B"]),
+    ]
+
+
+def test_universe_change_is_remapped_for_readers(tmp_path):
+    PricePanel(tmp_path, ["A", "B"]).merge(_closes(["A", "B"], "2024-01-01", "2024-01-31"), updated_at=1.0)
+    panel = PricePanel(tmp_path, ["B", "C", "A"])
+    snap = panel.snapshot()
+    assert snap.tickers == ("B", "C", "A")
+    assert np.isnan(snap.row("C")).all() and snap.row("A")[-1] == 110.0
+    panel.merge(_closes(["C"], "2024-01-15", "2024-02-05"))
+    assert json.loads((tmp_path / "manifest.json").read_text())["tickers"] == ["B", "C", "A"]
+    assert PricePanel(tmp_path, ["B", "C", "A"]).snapshot().row("C")[-1] == 110.0
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.risk import ReturnsMatrix, euler_contributions, portfolio_risk
+
+
+def _matrix(seed: int, n_rows: int, first_rows: dict[str, int] | None = None) -> ReturnsMatrix:
+    rng = np.random.default_rng(seed)
+    tickers = tuple(main.UNIVERSE)
+    n = len(tickers)
+    mix = rng.normal(0.0, 0.01, (n, n))
+    returns = rng.normal(0.0003, 1.0, (n_rows, n)) @ mix
+    first_row = np.array([(first_rows or {}).get(t, 0) for t in tickers])
+    returns[np.arange(n_rows)[:, None] < first_row] = 0.0
+    dates = np.datetime64("2020-01-01") + np.arange(n_rows)
+    return ReturnsMatrix(tickers, dates, returns, first_row, returns[:, tickers.index("SPY")])
+
+
+def _weights(**held: float) -> np.ndarray:
+    w = np.zeros(len(main.UNIVERSE))
+    for t, v in held.items():
+        w[main.UNIVERSE.index(t)] = v
+    return w
+
+
+def test_vol_components_sum_to_realised_vol():
+    # An unheld asset with short history must not shrink the window
+    m = _matrix(0, 400, {"BTC": 350})
+    w = _weights(SPY=0.5, GLD=0.3, TLT=0.2)
+    euler = euler_contributions(m, main.COVARIANCE, w[None, :])
+    realised = portfolio_risk(m, w, main.RISK_FREE_RATE)
+    assert euler["vol_c"].sum() == pytest.approx(realised["vol_annual"], rel=1e-12)
+    assert euler["vol"][0] == pytest.approx(realised["vol_annual"], rel=1e-12)
+
+
+def test_contributions_use_the_requested_risk_range(monkeypatch):
+    matrices = {"1y": _matrix(1, 252), "3y": _matrix(2, 756)}
+    monkeypatch.setattr(main, "_returns_for", lambda range_key: matrices[range_key])
+    w = _weights(SPY=0.4, BTC=0.1, GLD=0.5)
+
+    risk = main._risk_metrics("balanced", w, "1y")
+    assert risk.vol_annual == pytest.approx(portfolio_risk(matrices["1y"], w, main.RISK_FREE_RATE)["vol_annual"], abs=1e-4)
+
+    body = TestClient(main.app).post(
+        "/risk-contributions",
+        json={"portfolios": [{"SPY": 0.4, "BTC": 0.1, "GLD": 0.5}], "risk_range": "1y"},
+    ).json()
+    assert body["portfolios"][0]["vol_annual"] == pytest.approx(risk.vol_annual, abs=1e-4)
@@ -77,6 +77,9 @@ function EventBadge({ event }: { event: MarketEvent }) {
 const tickStyle = { fill: "rgba(255,255,255,0.4)", fontSize: 11 };
 const axisLine  = { stroke: "rgba(255,255,255,0.1)" };
 
+// Roughly one point per horizontal pixel of the charts
+const CHART_POINTS = 600;
+
 export default function HistoryPage() {
   const [tickers, setTickers]   = useState<TickerMeta[]>([]);
   const [ticker, setTicker]     = useState("SPY");
@@ -94,7 +97,7 @@ export default function HistoryPage() {
   useEffect(() => {
     setLoading(true);
     setError(null);
-    getAssetHistory(ticker, range)
+    getAssetHistory(ticker, range, { maxPoints: CHART_POINTS })
       .then(setData)
       .catch((e) => setError(e.message))
       .finally(() => setLoading(false));
@@ -7,6 +7,7 @@ export interface OptimizeRequest {
   btc_max: number;
   cash_max: number;
   per_asset_max: number;
+  risk_range?: "1y" | "3y" | "5y" | "max";
 }
 
 export interface AssetWeight {
@@ -29,6 +30,22 @@ export interface RiskMetrics {
 export interface RiskContribution {
   ticker: string;
   contribution_pct: number;
+  var_contribution_pct: number;
+  es_contribution_pct: number;
+}
+
+export interface PortfolioRisk {
+  vol_annual: number;
+  var95: number;
+  es95: number;
+  vol_pct: number[];
+  var_pct: number[];
+  es_pct: number[];
+}
+
+export interface RiskContributionsResponse {
+  tickers: string[];
+  portfolios: PortfolioRisk[];
 }
 
 export interface ConstraintsSummary {
@@ -66,6 +83,129 @@ export interface FrontierResponse {
   max_sharpe: SpecialPoint;
 }
 
+// ── Simulation ────────────────────────────────────────────────────────────────
+
+export interface SimulateRequest extends OptimizeRequest {
+  method?: "bootstrap" | "normal" | "t";
+  paths?: number;
+  years?: number;
+  block_days?: number;
+  dof?: number;
+  loss_threshold?: number;
+  seed?: number;
+}
+
+export interface FanBand {
+  years: number;
+  p5: number;
+  p25: number;
+  p50: number;
+  p75: number;
+  p95: number;
+}
+
+export interface TerminalBin {
+  wealth_lo: number;
+  wealth_hi: number;
+  prob: number;
+}
+
+export interface SimulateResponse {
+  method: string;
+  paths: number;
+  years: number;
+  seed: number;
+  weights: AssetWeight[];
+  bands: FanBand[];
+  terminal: TerminalBin[];
+  terminal_mean: number;
+  prob_loss: number;
+  prob_loss_anytime: number;
+}
+
+// ── Constraint sweep ──────────────────────────────────────────────────────────
+
+export interface SweepRequest {
+  profile: Profile;
+  btc_max: number[];
+  cash_max: number[];
+  per_asset_max: number[];
+  risk_range?: "1y" | "3y" | "5y" | "max";
+}
+
+// Cells are row-major over (per_asset_max, cash_max, btc_max): btc_max varies fastest.
+export interface SweepResponse {
+  profile: Profile;
+  per_asset_max: number[];
+  cash_max: number[];
+  btc_max: number[];
+  tickers: string[];
+  weights: number[][];
+  per_asset_cap: number[];
+  metrics: Record<string, number[]>;
+  solved: number;
+}
+
+// ── Backtest ──────────────────────────────────────────────────────────────────
+
+export interface RebalanceSchedule {
+  kind: "none" | "monthly" | "quarterly" | "threshold";
+  band?: number;
+}
+
+export interface BacktestRequest {
+  portfolios: (Profile | Record<string, number>)[];
+  schedules?: RebalanceSchedule[];
+  range?: "1y" | "3y" | "5y" | "max";
+  cost_bps?: number;
+  max_points?: number;
+}
+
+export interface BacktestStats {
+  total_return: number;
+  cagr: number;
+  vol_annual: number;
+  max_drawdown: number;
+  turnover_annual: number;
+  rebalances: number;
+  costs: number;
+}
+
+export interface BacktestRun {
+  portfolio: number;
+  schedule: string;
+  equity: number[];
+  drawdown: number[];
+  stats: BacktestStats;
+}
+
+export interface BacktestResponse {
+  dates: string[];
+  runs: BacktestRun[];
+}
+
+// ── Rolling analytics ─────────────────────────────────────────────────────────
+
+export type RollingMetric = "volatility" | "drawdown" | "beta";
+
+export interface RollingResponse {
+  metric: RollingMetric;
+  range: string;
+  window: number;
+  dates: string[];
+  series: Record<string, (number | null)[]>;
+}
+
+export interface CorrelationResponse {
+  range: string;
+  window: number;
+  tickers: string[];
+  dates: string[];
+  matrices: (number | null)[][][];
+  full_range: number[][];
+  estimator: string;
+}
+
 // ── Asset History ─────────────────────────────────────────────────────────────
 
 export interface PricePoint {
@@ -82,6 +222,13 @@ export interface AssetStats {
   total_return: number;
 }
 
+export interface WindowStats extends AssetStats {
+  ticker: string;
+  start: string;
+  end: string;
+  days: number;
+}
+
 export interface MarketEvent {
   date: string;
   label: string;
@@ -129,13 +276,122 @@ async function get<T>(path: string): Promise<T> {
   return res.json() as Promise<T>;
 }
 
+// Packed history format (see backend/app/wire.py):
+// "BLH1" | u32 header_len | JSON header | pad to 4 | i32 days | f32 price | f32 drawdown
+const HISTORY_BINARY = "application/vnd.btc-lab.history";
+
+function decodeHistory(buf: ArrayBuffer): AssetHistoryResponse {
+  const view = new DataView(buf);
+  const magic = String.fromCharCode(...new Uint8Array(buf, 0, 4));
+  if (magic !== "BLH1") throw new Error("Unexpected history payload");
+  const headerLen = view.getUint32(4, true);
+  const { n, ...header } = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 8, headerLen)));
+  let offset = 8 + headerLen;
+  offset += (4 - (offset % 4)) % 4;
+  const days = new Int32Array(buf, offset, n);
+  const prices = new Float32Array(buf, offset + 4 * n, n);
+  const drawdowns = new Float32Array(buf, offset + 8 * n, n);
+  const points: PricePoint[] = new Array(n);
+  for (let i = 0; i < n; i++) {
+    points[i] = {
+      date: new Date(days[i] * 86_400_000).toISOString().slice(0, 10),
+      price: +prices[i].toPrecision(7),
+      drawdown: +drawdowns[i].toPrecision(4),
+    };
+  }
+  return { ...header, prices: points } as AssetHistoryResponse;
+}
+
+async function getBinaryHistory(path: string): Promise<AssetHistoryResponse> {
+  const res = await fetch(`${API_BASE}${path}`, { headers: { Accept: HISTORY_BINARY } });
+  if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+  return decodeHistory(await res.arrayBuffer());
+}
+
 export const optimize = (req: OptimizeRequest) =>
   post<OptimizeResponse>("/optimize", req);
 
 export const getFrontier = (req: OptimizeRequest) =>
   post<FrontierResponse>("/frontier", req);
 
-export const getAssetHistory = (ticker: string, range: string) =>
-  get<AssetHistoryResponse>(`/asset-history?ticker=${ticker}&range=${range}`);
+export const simulate = (req: SimulateRequest) =>
+  post<SimulateResponse>("/simulate", req);
+
+export const sweep = (req: SweepRequest) =>
+  post<SweepResponse>("/sweep", req);
+
+export const backtest = (req: BacktestRequest) =>
+  post<BacktestResponse>("/backtest", req);
+
+export const getRolling = (
+  metric: RollingMetric,
+  { tickers, window = 63, range = "3y", maxPoints }: {
+    tickers?: string[]; window?: number; range?: string; maxPoints?: number;
+  } = {},
+) => {
+  const params = new URLSearchParams({ window: String(window), range });
+  if (tickers?.length) params.set("tickers", tickers.join(","));
+  if (maxPoints) params.set("max_points", String(maxPoints));
+  return get<RollingResponse>(`/rolling/${metric}?${params}`);
+};
+
+export const getRollingCorrelation = (window = 63, range = "3y", maxPoints?: number) => {
+  const params = new URLSearchParams({ window: String(window), range });
+  if (maxPoints) params.set("max_points", String(maxPoints));
+  return get<CorrelationResponse>(`/rolling/correlation?${params}`);
+};
+
+export const getRiskContributions = (
+  portfolios: Record<string, number>[],
+  riskRange: OptimizeRequest["risk_range"] = "3y",
+) =>
+  post<RiskContributionsResponse>("/risk-contributions", { portfolios, risk_range: riskRange });
+
+export const getAssetHistory = (
+  ticker: string,
+  range: string,
+  window?: { start?: string; end?: string; maxPoints?: number },
+) => {
+  const params = new URLSearchParams({ ticker, range });
+  if (window?.start) params.set("start", window.start);
+  if (window?.end) params.set("end", window.end);
+  if (window?.maxPoints) params.set("max_points", String(window.maxPoints));
+  return getBinaryHistory(`/asset-history?${params}`);
+};
+
+// Stats for a brushed sub-range of the chart (constant-time on the server)
+export const getAssetStats = (ticker: string, start: string, end: string) =>
+  get<WindowStats>(`/asset-stats?${new URLSearchParams({ ticker, start, end })}`);
+
+// Every daily bar (with running drawdown) of one or more tickers, interleaved
+// by date and yielded as NDJSON lines arrive
+export interface HistoryBar {
+  date: string;
+  ticker: string;
+  close: number;
+  drawdown: number;
+}
+
+export async function* streamAssetHistory(
+  tickers: string[],
+  range: string,
+  window?: { start?: string; end?: string },
+): AsyncGenerator<HistoryBar> {
+  const params = new URLSearchParams({ tickers: tickers.join(","), range });
+  if (window?.start) params.set("start", window.start);
+  if (window?.end) params.set("end", window.end);
+  const res = await fetch(`${API_BASE}/asset-history/stream?${params}`);
+  if (!res.ok || !res.body) throw new Error(`${res.status} ${res.statusText}`);
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let rest = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    const lines = (rest + value).split("\n");
+    rest = lines.pop() ?? "";
+    for (const line of lines) if (line) yield JSON.parse(line) as HistoryBar;
+  }
+  if (rest) yield JSON.parse(rest) as HistoryBar;
+}
 
 export const getTickers = () => get<TickerMeta[]>("/tickers");